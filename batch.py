@@ -0,0 +1,253 @@
+"""
+Run search and summarize jobs from a file, without the UI.
+
+    python batch.py queries.csv --job web --prompt "Summarize the main points." -o summaries.jsonl
+    python batch.py watchlist.csv --job finance -o quotes.parquet --rate serpapi=2
+    python batch.py jobs.jsonl -o out.jsonl --workers 8 --rate openai=5,web=10
+
+The input is CSV with a header row, JSON lines (.jsonl) or a JSON array of
+objects (.json), one job per row. Columns a job does not find in its row
+are taken from the command line options:
+
+    youtube   query, prompt, urls (optional, space separated)
+    web       query, prompt, urls, focused, boilerplate
+    news      query (the topic), prompt, urls, focused, boilerplate
+    hotel     query (the place), check_in, check_out, adults, limit
+    finance   query (the symbol)
+
+focused and boilerplate are yes/no flags: answer from the most relevant
+passages only, and drop menu, cookie banner and footer lines. A row may
+also carry id, job and model. Results are written as each job
+finishes: appended to a .jsonl file, or as parquet part files under a
+.parquet directory. Running the same command again skips the rows already
+written with status ok, so an interrupted run picks up where it stopped
+and failed rows are tried again.
+"""
+import os, sys, csv, json, time, uuid, argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from cache import make_key
+import pipelines, ratelimit, tracing
+
+
+MODEL = "gpt-3.5-turbo-0125"
+WORKERS = 4
+ANSWER_COLUMNS = ["answer", "tokens", "sources", "failures", "price", "movement", "points"]
+
+# column -> dtype of the parquet output, so every part file has the same schema
+PARQUET_COLUMNS = {
+    "id": "string", "job": "string", "query": "string", "model": "string", "status": "string",
+    "error": "string", "answer": "string", "tokens": "Int64", "sources": "string", "failures": "string",
+    "price": "Float64", "movement": "string", "points": "Int64", "seconds": "float64",
+}
+
+
+def run_youtube(client, row, api_key):
+    return pipelines.summarize_videos(client, row["model"], row["query"], row["prompt"], api_key, row.get("urls"))
+
+
+def run_web(client, row, api_key):
+    return pipelines.summarize_web(client, row["model"], row["query"], row["prompt"], api_key, row.get("urls"),
+                                   focused=_flag(row.get("focused")), boilerplate=_flag(row.get("boilerplate")))
+
+
+def run_news(client, row, api_key):
+    return pipelines.summarize_news(client, row["model"], row["query"], row["prompt"], api_key, row.get("urls"),
+                                    focused=_flag(row.get("focused")), boilerplate=_flag(row.get("boilerplate")))
+
+
+def run_hotel(client, row, api_key):
+    return pipelines.compare_hotels(client, row["model"], row["query"], row["check_in"], row["check_out"],
+                                    row.get("adults") or 2, api_key, row.get("limit"))
+
+
+def run_finance(client, row, api_key):
+    return pipelines.finance_quote(row["query"], api_key)
+
+
+JOBS = {
+    "youtube": run_youtube,
+    "web": run_web,
+    "news": run_news,
+    "hotel": run_hotel,
+    "finance": run_finance,
+}
+
+
+def _flag(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def read_rows(path):
+    """
+    Rows of a CSV file with a header, a JSON lines file or a JSON array, as
+    dicts with blank values dropped. Only the array is read whole. The extra
+    fields of a CSV line longer than its header are dropped, and a JSON row
+    that is not an object is passed on as is for run_batch to report.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in f if line.strip())
+        elif path.endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            if not isinstance(row, dict):
+                yield row
+                continue
+            yield {k: v for k, v in row.items() if isinstance(k, str) and v not in (None, "")}
+
+
+def row_id(row):
+    """The row's own id, or a hash of the job and its inputs so the same row keeps the same id."""
+    return str(row.get("id") or make_key(row))
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def done(self):
+        done = set()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+                if record.get("status") == "ok":
+                    done.add(record["id"])
+        return done
+
+    def write(self, record):
+        self.file.write(json.dumps(record, default=str) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    One part file per record under a directory, written as soon as the record
+    is done so an interrupted run loses nothing, readable together with
+    pandas.read_parquet(path). Nested values are stored as json text.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def done(self):
+        import pandas as pd
+        if not any(name.endswith(".parquet") for name in os.listdir(self.path)):
+            return set()
+        df = pd.read_parquet(self.path, columns=["id", "status"])
+        return set(df.loc[df["status"] == "ok", "id"])
+
+    def write(self, record):
+        import pandas as pd
+        record = {k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in record.items()}
+        df = pd.DataFrame({column: pd.array([record.get(column)], dtype=dtype)
+                           for column, dtype in PARQUET_COLUMNS.items()})
+        name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+        df.to_parquet(os.path.join(self.path, name), index=False)
+
+    def close(self):
+        pass
+
+
+def open_writer(path):
+    if path.endswith(".parquet"):
+        return ParquetWriter(path)
+    return JsonlWriter(path)
+
+
+def run_row(client, row, api_key):
+    """Run one row, returns the output record, with the error instead of the answer when it failed."""
+    record = {"id": row["id"], "job": row["job"], "query": row.get("query"), "model": row.get("model")}
+    start = time.perf_counter()
+    with tracing.span(f"batch.{row['job']}", trace_id=tracing.new_trace_id(), id=row["id"]):
+        try:
+            result = JOBS[row["job"]](client, row, api_key)
+            record.update({k: result.get(k) for k in ANSWER_COLUMNS}, status="ok", error=None)
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def run_batch(rows, writer, client, api_key, workers=WORKERS, defaults=None, log=sys.stderr):
+    """
+    Run every row not already done on a pool of workers and write each record
+    as soon as it is done. At most twice as many rows as workers are read
+    ahead, so the input can be far larger than memory. Returns (ok, failed,
+    skipped) counts.
+    """
+    done = writer.done()
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    def report(record):
+        counts[record["status"]] += 1
+        writer.write(record)
+        print(f"[batch] {record['status']:5} {record['id'][:12]} {record['seconds']:7.2f}s "
+              f"{record.get('error') or record.get('query') or ''}", file=log)
+
+    running = set()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for row in rows:
+                if not isinstance(row, dict):
+                    report({"id": make_key(row), "job": None, "query": None, "status": "error",
+                            "error": f"row is not an object: {row!r:.80}", "seconds": 0.0})
+                    continue
+                row = dict(defaults or {}, **row)
+                row["id"] = row_id(row)
+                if row["id"] in done:
+                    counts["skipped"] += 1
+                    continue
+                if row.get("job") not in JOBS:
+                    report({"id": row["id"], "job": row.get("job"), "query": row.get("query"), "status": "error",
+                            "error": f"unknown job {row.get('job')!r}", "seconds": 0.0})
+                    continue
+                if len(running) >= workers * 2:
+                    finished, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        report(future.result())
+                running.add(pool.submit(run_row, client, row, api_key))
+            for future in wait(running).done:
+                report(future.result())
+    finally:
+        # an interrupted run keeps every record reported so far
+        writer.close()
+    return counts["ok"], counts["error"], counts["skipped"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split("\n\n", 1)[1])
+    parser.add_argument("input", help="CSV with a header row, JSON lines or a JSON array")
+    parser.add_argument("-o", "--output", required=True, help="results .jsonl file or .parquet directory")
+    parser.add_argument("--job", choices=list(JOBS), help="job for rows without a job column")
+    parser.add_argument("--prompt", help="prompt for rows without a prompt column")
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="rows run at the same time")
+    parser.add_argument("--rate", default="",
+                        help="calls per second per api, e.g. serpapi=2,openai=5,web=10")
+    args = parser.parse_args(argv)
+
+    for name, per_second in ratelimit.parse_limits(args.rate).items():
+        ratelimit.set_limit(name, per_second, burst=args.workers)
+    defaults = {k: v for k, v in (("job", args.job), ("prompt", args.prompt), ("model", args.model)) if v}
+
+    from openai import OpenAI
+    client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+    ok, failed, skipped = run_batch(read_rows(args.input), open_writer(args.output), client,
+                                    os.environ.get('SERPAPI_KEY'), args.workers, defaults)
+    print(f"[batch] {ok} done, {failed} failed, {skipped} already done", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
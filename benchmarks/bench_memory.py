@@ -0,0 +1,114 @@
+"""
+Peak memory of scraping one large page, before and after the streaming
+ingestion: the old WebBaseLoader, split, join and clean path against
+scraper.scrape_url, which parses and cleans the page as it downloads and
+stops at the byte cap. Both then cut the text into condense sized chunks.
+
+    python benchmarks/bench_memory.py                 # 1, 8 and 32 MB pages
+    python benchmarks/bench_memory.py --mb 64 --no-cap
+
+Every measurement runs in a fresh interpreter. On Linux the peak RSS is
+reset once the imports are done, elsewhere the growth is measured from the
+peak reached while importing.
+"""
+import os, sys, json, time, argparse, resource, subprocess, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _proc_status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def reset_peak():
+    """
+    Start a new peak RSS measurement, returns a function giving the growth
+    since. Uses /proc/self/clear_refs where it exists, ru_maxrss otherwise.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        base = _proc_status_mb("VmRSS")
+        return lambda: _proc_status_mb("VmHWM") - base
+    except OSError:
+        base = max_rss_mb()
+        return lambda: max_rss_mb() - base
+
+
+def old_ingest(url):
+    # the path scrape_url replaced, kept here as the baseline
+    from langchain_community.document_loaders import WebBaseLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from textclean import clean_page
+    from summarize import chunk_text, CHUNK_TOKENS
+    docs = WebBaseLoader(url).load()
+    splits = RecursiveCharacterTextSplitter().split_documents(docs)
+    text = clean_page("".join(doc.page_content for doc in splits))
+    chunks = chunk_text(text, CHUNK_TOKENS)
+    return len(text), len(chunks)
+
+
+def new_ingest(url, max_bytes):
+    import scraper
+    from textclean import clean_page
+    from summarize import iter_chunks, CHUNK_TOKENS
+    text = scraper.scrape_url(url, clean=clean_page, max_bytes=max_bytes)
+    return len(text), sum(1 for _ in iter_chunks([text], CHUNK_TOKENS))
+
+
+def child(case, url, max_bytes):
+    """Runs in the subprocess: one ingestion, prints its RSS growth as json."""
+    os.environ["SUPERAPP_CACHE_DIR"] = tempfile.mkdtemp(prefix="superapp-bench-")
+    import scraper, summarize, textclean  # noqa: imports are not part of the measurement
+    from langchain_community.document_loaders import WebBaseLoader  # noqa
+    from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa
+    growth = reset_peak()
+    start = time.perf_counter()
+    chars, chunks = old_ingest(url) if case == "old" else new_ingest(url, max_bytes)
+    print(json.dumps({"seconds": time.perf_counter() - start, "rss_mb": growth(),
+                      "chars": chars, "chunks": chunks}))
+
+
+def measure(case, url, max_bytes):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", case, url, str(max_bytes)],
+                         capture_output=True, text=True, check=True,
+                         env=dict(os.environ, USER_AGENT=os.environ.get("USER_AGENT", "bench")))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mb", type=int, action="append", help="page size in megabytes, repeatable")
+    parser.add_argument("--no-cap", action="store_true", help="read whole pages, to see the streaming alone")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        case, url, max_bytes = args.child
+        return child(case, url, int(max_bytes))
+
+    from stubs import StubServer
+    import scraper
+    max_bytes = 1 << 40 if args.no_cap else scraper.MAX_PAGE_BYTES
+    print(f"{'page':>6}  {'path':4}  {'peak rss mb':>11}  {'seconds':>7}  {'chars kept':>10}  {'chunks':>6}")
+    for mb in args.mb or [1, 8, 32]:
+        with StubServer(page_kb=mb * 1024, latency=0) as server:
+            url = f"{server.url}/article/{mb}"
+            server.httpd.page(str(mb))  # build the page before anything is measured
+            for case in ("old", "new"):
+                r = measure(case, url, max_bytes)
+                print(f"{mb:>4}MB  {case:4}  {r['rss_mb']:>11.1f}  {r['seconds']:>7.2f}  {r['chars']:>10,}  {r['chunks']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare the old character by character remove_punctuation with
+textclean.clean_text on synthetic pages of realistic sizes.
+
+    python benchmarks/bench_textclean.py
+"""
+import os, sys, random, timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from textclean import clean_text
+
+
+def remove_punctuation(word):
+    # the implementation clean_text replaced, kept here as the baseline
+    new_word = ""
+    for letter in word:
+        if letter.isalpha() or letter.isdigit() or letter==' ' or letter==',' or letter=='.':
+            new_word += letter
+    return new_word
+
+
+def make_page(size, seed=0):
+    rnd = random.Random(seed)
+    # mostly english news copy with the odd curly quote, dash and accented or cjk word
+    words = ("the market grew by 4.5% in Q3, according to analysts; revenue (adjusted) rose to "
+             "$120m, a record. We're pleased, said the CEO's office. e-mail info@example.com "
+             "#growth 2024 re-election").split() * 8
+    words += ["café", "naïve", "東京", "—", "“quoted”", "it’s"]
+    nav = ["Home", "Menu", "Sign in", "Subscribe to our newsletter", "Accept all cookies", "Privacy Policy"]
+    parts = []
+    total = 0
+    while total < size:
+        if rnd.random() < 0.1:
+            line = rnd.choice(nav)
+        else:
+            line = " ".join(rnd.choice(words) for _ in range(rnd.randint(20, 80))) + "."
+        parts.append(line)
+        parts.append("\n\n" if rnd.random() < 0.3 else "\n")
+        total += len(line) + 1
+    return "".join(parts)
+
+
+def main():
+    print(f"{'size':>10} {'old ms':>10} {'new ms':>10} {'speedup':>8}")
+    for size in (50_000, 200_000, 1_000_000):
+        page = make_page(size)
+        n = 5
+        old = min(timeit.repeat(lambda: remove_punctuation(page), number=1, repeat=n)) * 1000
+        new = min(timeit.repeat(lambda: clean_text(page), number=1, repeat=n)) * 1000
+        print(f"{size:>10} {old:>10.1f} {new:>10.1f} {old / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+Headless, offline benchmark of every service pipeline. SerpAPI, OpenAI,
+YouTube, the scraped websites and D-ID are replaced by the stubs in
+benchmarks/stubs.py, so the numbers only move when our code does.
+
+    python benchmarks/run.py                     # all branches, 3 cold iterations
+    python benchmarks/run.py -b generic -n 10    # one branch
+    python benchmarks/run.py --warm              # keep caches between iterations
+    python benchmarks/run.py --json out.json     # also write the summary for comparison
+    python benchmarks/run.py --spans             # also break the stages down by traced step
+
+Every stage reports wall time percentiles, the peak of Python allocations
+made while it ran (tracemalloc) and the tokens billed by the stubbed model.
+"""
+import os, sys, json, math, time, shutil, argparse, tempfile, tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# the caches must not touch the real cache directory
+os.environ["SUPERAPP_CACHE_DIR"] = tempfile.mkdtemp(prefix="superapp-bench-")
+
+from stubs import FakeGoogleSearch, FakeOpenAI, FakeYouTube, StubServer
+
+import search, transcribe, did_video, scraper, llm, retrieval, tracing
+from search import cached_search
+from results import to_frame
+from transcribe import transcribe_videos
+from summarize import condense
+from llm import stream_chat_completion
+from hotels import search_hotels, project, compact_table
+from finance import get_quote, price_frame
+from pipelines import (youtube_params, web_params, news_params, hotel_params, video_messages,
+                       page_messages, hotel_messages, read_pages, page_context, answer)
+from cache import CACHE_DIR
+
+
+MODEL = "gpt-3.5-turbo-0125"
+PROMPT = "Summarize the main points of the following content."
+FOLLOWUP = "What fees do hedge funds charge?"
+
+
+class Recorder:
+    def __init__(self, alloc=True):
+        self.alloc = alloc
+        self.samples = defaultdict(list)  # stage -> [(seconds, peak bytes, tokens)]
+
+    def add(self, name, seconds, peak=0, tokens=0):
+        self.samples[name].append((seconds, peak, tokens))
+
+    @contextmanager
+    def stage(self, name):
+        info = {"tokens": 0}
+        if self.alloc:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield info
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - base if self.alloc else 0
+        self.add(name, seconds, peak, info["tokens"])
+
+    def summary(self):
+        rows = []
+        for name, samples in self.samples.items():
+            seconds = sorted(s for s, _, _ in samples)
+            rows.append({
+                "stage": name,
+                "n": len(samples),
+                "p50_ms": round(percentile(seconds, 50) * 1000, 1),
+                "p95_ms": round(percentile(seconds, 95) * 1000, 1),
+                "max_ms": round(seconds[-1] * 1000, 1),
+                "peak_kb": round(max(p for _, p, _ in samples) / 1024),
+                "tokens": round(sum(t for _, _, t in samples) / len(samples)),
+            })
+        return rows
+
+
+def percentile(sorted_values, pct):
+    """Nearest rank percentile of an already sorted list."""
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def reset_caches():
+    for cache in (search.search_cache, llm.completion_cache, scraper.page_cache,
+                  transcribe.transcript_store, did_video.video_cache):
+        cache.clear()
+    retrieval.clear_memory()
+    shutil.rmtree(retrieval.EMBEDDING_DIR, ignore_errors=True)
+
+
+def stream_answer(rec, name, client, messages):
+    """Consume a streamed answer, recording time to first token and the full answer."""
+    start = time.perf_counter()
+    first = None
+    tokens = 0
+    for text, usage in stream_chat_completion(client, MODEL, messages):
+        if text and first is None:
+            first = time.perf_counter() - start
+        if usage is not None:
+            tokens = usage
+    rec.add(f"{name}.first_token", first or 0.0)
+    rec.add(f"{name}.answer", time.perf_counter() - start, tokens=tokens)
+
+
+def run_youtube(rec, client, server):
+    with rec.stage("youtube.search"):
+        results = cached_search(youtube_params("hedge funds explained", "x"))
+    with rec.stage("youtube.table"):
+        df = to_frame(results, "video_results", index="Title")
+    with rec.stage("youtube.transcribe"):
+        transcripts, _ = transcribe_videos(client, list(df["Link"][:3]))
+    with rec.stage("youtube.condense") as s:
+        context, s["tokens"] = condense(client, MODEL, PROMPT, transcripts)
+    stream_answer(rec, "youtube", client, video_messages(PROMPT, context))
+
+
+def _run_pages(rec, name, client, results, key):
+    # the steps the web and news pages run, in the app's default focused mode
+    with rec.stage(f"{name}.table"):
+        df = to_frame(results, key, index="Position")
+    with rec.stage(f"{name}.scrape"):
+        pages, _ = read_pages(list(df["Link"][:3]))
+    with rec.stage(f"{name}.context") as s:
+        context, s["tokens"] = page_context(client, MODEL, PROMPT, pages)
+    stream_answer(rec, name, client, page_messages(PROMPT, context))
+    with rec.stage(f"{name}.followup") as s:
+        focused, used = page_context(client, MODEL, FOLLOWUP, pages)
+        _, tokens = answer(client, MODEL, page_messages(FOLLOWUP, focused))
+        s["tokens"] = used + tokens
+
+
+def run_generic(rec, client, server):
+    with rec.stage("generic.search"):
+        results = cached_search(web_params("what is a hedge fund", "x"))
+    _run_pages(rec, "generic", client, results, "organic_results")
+
+
+def run_topic(rec, client, server):
+    with rec.stage("topic.search"):
+        results = cached_search(news_params("Business", "x"))
+    _run_pages(rec, "topic", client, results, "news_results")
+
+
+def run_hotel(rec, client, server):
+    params = hotel_params("bali resorts", "2024-06-25", "2024-07-06", 2, "x")
+    with rec.stage("hotel.search"):
+        shortlist, _ = search_hotels(params, 7)
+    with rec.stage("hotel.project"):
+        table = compact_table([project(prop) for prop in shortlist])
+    stream_answer(rec, "hotel", client, hotel_messages(table))
+    with rec.stage("hotel.more"):
+        search_hotels(params, 28)
+
+
+def run_finance(rec, client, server):
+    with rec.stage("finance.quote"):
+        results = get_quote("AMZN:NASDAQ", "x")
+    with rec.stage("finance.chart"):
+        price_frame(results)
+
+
+def run_video(rec, client, server):
+    with rec.stage("video.render"):
+        did_video.generate_video("user", "pass", "A short summary to read out.", "https://example.com/face.png",
+                                 base_url=server.url)
+
+
+BRANCHES = {
+    "youtube": run_youtube,
+    "generic": run_generic,
+    "topic": run_topic,
+    "hotel": run_hotel,
+    "finance": run_finance,
+    "video": run_video,
+}
+
+
+def span_summary(spans):
+    """Traced steps grouped by name: count, p50 and total time, tokens, and cache hits."""
+    grouped = defaultdict(list)
+    for s in spans:
+        grouped[s["name"]].append(s)
+    rows = []
+    for name, group in sorted(grouped.items()):
+        seconds = sorted(s["seconds"] for s in group)
+        rows.append({
+            "span": name,
+            "n": len(group),
+            "p50_ms": round(percentile(seconds, 50) * 1000, 1),
+            "total_ms": round(sum(seconds) * 1000, 1),
+            "tokens": sum(s["attrs"].get("tokens") or 0 for s in group),
+            "hits": sum(s["attrs"].get("cache") == "hit" for s in group),
+        })
+    return rows
+
+
+def print_table(rows, columns=("stage", "n", "p50_ms", "p95_ms", "max_ms", "peak_kb", "tokens")):
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) if c == columns[0] else c.rjust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) if c == columns[0] else str(r[c]).rjust(widths[c]) for c in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-b", "--branch", action="append", choices=list(BRANCHES),
+                        help="branch to run, repeatable, default all")
+    parser.add_argument("-n", "--iterations", type=int, default=3)
+    parser.add_argument("--warm", action="store_true", help="keep caches between iterations")
+    parser.add_argument("--page-kb", type=int, default=200, help="size of each scraped page")
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="multiplier on every stub latency, 0 measures our own overhead only")
+    parser.add_argument("--no-alloc", action="store_true", help="skip tracemalloc, it slows CPU heavy stages")
+    parser.add_argument("--spans", action="store_true", help="also summarize the traced steps by name")
+    parser.add_argument("--json", help="write the summary rows to this file")
+    args = parser.parse_args(argv)
+
+    FakeGoogleSearch.latency *= args.latency
+    FakeYouTube.latency *= args.latency
+    search.GoogleSearch = FakeGoogleSearch
+    transcribe.YouTube = FakeYouTube
+    did_video.FIRST_POLL = 0.05
+    client = FakeOpenAI(latency=0.4 * args.latency, token_latency=0.002 * args.latency,
+                        whisper_latency=1.0 * args.latency)
+
+    traced = []
+    if args.spans:
+        tracing.exporters.append(traced.append)
+    rec = Recorder(alloc=not args.no_alloc)
+    if rec.alloc:
+        tracemalloc.start()
+    with StubServer(page_kb=args.page_kb, latency=0.2 * args.latency) as server:
+        FakeGoogleSearch.base_url = server.url
+        for i in range(args.iterations):
+            if not args.warm or i == 0:
+                reset_caches()
+            for name in args.branch or list(BRANCHES):
+                BRANCHES[name](rec, client, server)
+
+    rows = rec.summary()
+    print_table(rows)
+    if args.spans:
+        print()
+        print_table(span_summary(traced), ("span", "n", "p50_ms", "total_ms", "tokens", "hits"))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=1)
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Stand-ins for every upstream service, replaying the recorded fixtures so the
+pipelines can run with no network access.
+
+- FakeGoogleSearch replays SerpAPI responses per engine
+- FakeOpenAI answers chat completions (plain and streamed), Whisper and embeddings
+- FakeYouTube writes an audio file whose content the Whisper stub turns into the transcript
+- StubServer is a local HTTP server for the scraped pages and the D-ID talks endpoint
+
+Each stub sleeps for a configurable latency so concurrency shows in the timings.
+"""
+import os, json, time, hashlib, threading
+from types import SimpleNamespace as NS
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def json_fixture(name, base_url=""):
+    return json.loads(fixture(name).replace("{base}", base_url))
+
+
+class FakeGoogleSearch:
+    """Same interface as serpapi.GoogleSearch, answers from the fixtures."""
+
+    latency = 0.3
+    base_url = ""
+    calls = 0
+
+    def __init__(self, params):
+        self.params = params
+
+    def get_dict(self):
+        FakeGoogleSearch.calls += 1
+        time.sleep(self.latency)
+        engine = self.params.get("engine", "google")
+        if engine == "youtube":
+            name = "serpapi_youtube.json"
+        elif engine == "google_hotels":
+            name = "serpapi_hotels_p2.json" if self.params.get("next_page_token") else "serpapi_hotels_p1.json"
+        elif engine == "google_finance":
+            name = "serpapi_finance.json"
+        elif self.params.get("tbm") == "nws":
+            name = "serpapi_news.json"
+        else:
+            name = "serpapi_search.json"
+        return json_fixture(name, self.base_url)
+
+
+def _words(n):
+    base = "The page describes pooled funds, fees, leverage and the main strategies in plain terms".split()
+    return " ".join(base[i % len(base)] for i in range(n))
+
+
+class _Completions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, model, messages, temperature=0, stream=False, stream_options=None):
+        from summarize import count_tokens
+        time.sleep(self.owner.latency)
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        # the answer depends on the request, so different prompts never look like cache hits
+        digest = hashlib.sha256(json.dumps(messages).encode("utf-8")).hexdigest()[:12]
+        answer = f"Answer {digest}. " + _words(self.owner.answer_words)
+        usage = NS(prompt_tokens=prompt_tokens, completion_tokens=self.owner.answer_words,
+                   total_tokens=prompt_tokens + self.owner.answer_words)
+        self.owner.tokens += usage.total_tokens
+        if not stream:
+            return NS(choices=[NS(message=NS(content=answer))], usage=usage)
+        return self._stream(answer, usage)
+
+    def _stream(self, answer, usage):
+        for word in answer.split(" "):
+            time.sleep(self.owner.token_latency)
+            yield NS(choices=[NS(delta=NS(content=word + " "))], usage=None)
+        yield NS(choices=[], usage=usage)
+
+
+class _Transcriptions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, model, response_format, file):
+        time.sleep(self.owner.whisper_latency)
+        return file.read().decode("utf-8")
+
+
+class _Embeddings:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, model, input):
+        time.sleep(self.owner.latency / 4)
+        return NS(data=[NS(embedding=self._vector(text)) for text in input])
+
+    @staticmethod
+    def _vector(text, dims=64):
+        digest = hashlib.sha256(text.encode("utf-8")).digest() * (dims // 32)
+        return [(b - 128) / 128 for b in digest[:dims]]
+
+
+class FakeOpenAI:
+    """The parts of openai.OpenAI the app uses: chat.completions, audio.transcriptions and embeddings."""
+
+    def __init__(self, latency=0.4, token_latency=0.002, whisper_latency=1.0, answer_words=250):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.whisper_latency = whisper_latency
+        self.answer_words = answer_words
+        self.tokens = 0
+        self.chat = NS(completions=_Completions(self))
+        self.audio = NS(transcriptions=_Transcriptions(self))
+        self.embeddings = _Embeddings(self)
+
+
+class FakeYouTube:
+    """pytube.YouTube stand-in, the downloaded 'audio' is the transcript fixture."""
+
+    latency = 0.8
+
+    def __init__(self, url):
+        self.url = url
+        self.streams = self
+
+    def filter(self, **kwargs):
+        return self
+
+    def first(self):
+        return self
+
+    def download(self, output_path, filename):
+        time.sleep(self.latency)
+        path = os.path.join(output_path, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(fixture("transcript.txt"))
+        return path
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type, status=200):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading, e.g. at its byte cap
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        if self.path.startswith("/article/"):
+            self._send(server.page(self.path.rsplit("/", 1)[1]), "text/html; charset=utf-8")
+        elif self.path.startswith("/talks/"):
+            talk_id = self.path.rsplit("/", 1)[1]
+            with server.lock:
+                n = server.polls.get(talk_id, 0)
+                server.polls[talk_id] = n + 1
+            polls = server.did["polls"]
+            self._send(json.dumps(polls[min(n, len(polls) - 1)]), "application/json")
+        else:
+            self._send("not found", "text/plain", 404)
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        time.sleep(server.latency)
+        if self.path == "/talks":
+            with server.lock:
+                server.talks += 1
+                talk_id = f"{server.did['create']['id']}_{server.talks}"
+            self._send(json.dumps(dict(server.did["create"], id=talk_id)), "application/json", 201)
+        else:
+            self._send("not found", "text/plain", 404)
+
+
+class StubServer:
+    """
+    Local HTTP server on a free port serving /article/<n> pages of about
+    page_kb kilobytes and a D-ID compatible /talks endpoint.
+    """
+
+    def __init__(self, page_kb=200, latency=0.2):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.page = self._page
+        self.httpd.did = json_fixture("did_talk.json")
+        self.httpd.polls = {}
+        self.httpd.talks = 0
+        self.httpd.lock = threading.Lock()
+        self.page_kb = page_kb
+        self._pages = {}
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def _page(self, article):
+        """The article fixture with its body repeated to page_kb, numbered so no two pages share text."""
+        if article not in self._pages:
+            html = fixture("article.html")
+            head, rest = html.split("<!--BODY-->")
+            body, tail = rest.split("<!--/BODY-->")
+            repeats = max(1, self.page_kb * 1024 // len(body.encode("utf-8")))
+            sections = "".join(f"<h2>Article {article}, section {k}</h2>{body}" for k in range(repeats))
+            self._pages[article] = head + sections + tail
+        return self._pages[article]
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,144 @@
+import os, json, time, sqlite3, hashlib, threading
+from collections import OrderedDict
+
+
+CACHE_DIR = os.environ.get('SUPERAPP_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'superapp'))
+PRUNE_EVERY = 100  # disk writes between two passes over the expired and surplus entries
+
+
+def make_key(*parts):
+    """Stable hash of any JSON serializable parts, used as a cache key."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Two tier cache: an in-process LRU in front of a SQLite table on disk.
+
+    Every entry carries its own expiry so callers can choose a TTL per kind of
+    result. Values must be JSON serializable. The in-process tier survives
+    Streamlit reruns because imported modules stay loaded, the disk tier
+    survives restarts and is shared by every worker on the machine.
+
+    The memory tier and the SQLite connection have separate locks, so a
+    memory hit never waits for a disk read or write in another thread.
+
+    max_memory_bytes, when set, also bounds the memory tier by the size of
+    the values as json. A value larger than that is only kept on disk.
+    """
+
+    def __init__(self, name, max_items=256, disk=True, path=None, max_disk_items=10000, max_memory_bytes=None):
+        self.name = name
+        self.max_items = max_items
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_items = max_disk_items
+        self.disk = disk
+        self.path = path or os.path.join(CACHE_DIR, f'{name}.sqlite3')
+        self._memory = OrderedDict()  # key -> (value, expires, size)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()  # memory tier and stats
+        self._db_lock = threading.Lock()  # the sqlite connection
+        self._db = None
+        self._writes = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+                      'hit_seconds': 0.0, 'miss_seconds': 0.0}
+
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS entries '
+                             '(key TEXT PRIMARY KEY, value TEXT, expires REAL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)')
+        return self._db
+
+    def _forget(self, key):
+        self._memory_bytes -= self._memory.pop(key)[2]
+
+    def _remember(self, key, value, expires, size=0):
+        if key in self._memory:
+            self._forget(key)
+        if self.max_memory_bytes and size > self.max_memory_bytes:
+            return
+        self._memory[key] = (value, expires, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_items or (
+                self.max_memory_bytes and self._memory_bytes > self.max_memory_bytes):
+            self._forget(next(iter(self._memory)))
+
+    def get(self, key):
+        """Return the cached value or None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return entry[0]
+                self._forget(key)
+        row = None
+        if self.disk:
+            with self._db_lock:
+                row = self._connect().execute(
+                    'SELECT value, expires FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is not None and row[1] > now:
+            value = json.loads(row[0])
+            with self._lock:
+                self._remember(key, value, row[1], len(row[0]))
+                self.stats['disk_hits'] += 1
+            return value
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, key, value, ttl):
+        expires = time.time() + ttl
+        data = json.dumps(value) if self.disk or self.max_memory_bytes else None
+        with self._lock:
+            self._remember(key, value, expires, len(data) if data is not None else 0)
+        if not self.disk:
+            return
+        with self._db_lock:
+            db = self._connect()
+            db.execute('INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)',
+                       (key, data, expires))
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune(db)
+            db.commit()
+
+    def _prune(self, db):
+        """Drop expired entries, then the ones closest to expiry past max_disk_items. Both use the index."""
+        db.execute('DELETE FROM entries WHERE expires <= ?', (time.time(),))
+        surplus = db.execute('SELECT count(*) FROM entries').fetchone()[0] - self.max_disk_items
+        if surplus > 0:
+            db.execute('DELETE FROM entries WHERE key IN '
+                       '(SELECT key FROM entries ORDER BY expires LIMIT ?)', (surplus,))
+
+    def record(self, hit, seconds):
+        """Add the wall time of a lookup (hit) or an upstream call (miss)."""
+        with self._lock:
+            self.stats['hit_seconds' if hit else 'miss_seconds'] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.disk:
+            with self._db_lock:
+                db = self._connect()
+                db.execute('DELETE FROM entries')
+                db.commit()
+
+    def summary(self):
+        """Counters plus derived hit rate and an estimate of the time saved."""
+        s = dict(self.stats)
+        hits = s['memory_hits'] + s['disk_hits']
+        total = hits + s['misses']
+        avg_miss = s['miss_seconds'] / s['misses'] if s['misses'] else 0.0
+        s['hit_rate'] = round(hits / total, 3) if total else 0.0
+        s['avg_miss_seconds'] = round(avg_miss, 3)
+        s['saved_seconds'] = round(max(hits * avg_miss - s['hit_seconds'], 0.0), 3)
+        return s
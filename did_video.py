@@ -0,0 +1,133 @@
+import os, time, threading, requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from cache import ResultCache, make_key
+from tracing import span, propagate
+from ratelimit import throttle
+
+
+DID_API_URL = os.environ.get('DID_API_URL', 'https://api.d-id.com')
+FIRST_POLL = 1.0  # seconds before the first status check
+MAX_POLL = 8.0
+DEADLINE = 180.0  # give up on a render after this many seconds
+RESULT_TTL = 12 * 60 * 60  # d-id result urls are signed and expire, don't keep them longer
+
+# hash of (input_text, source_url) -> result_url
+video_cache = ResultCache('did_videos', max_items=64)
+
+_session = None
+_session_lock = threading.Lock()
+_jobs = ThreadPoolExecutor(max_workers=4)
+
+
+class VideoError(Exception):
+    pass
+
+
+def get_session():
+    """One pooled requests.Session shared by every submit and poll."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount('https://', HTTPAdapter(pool_maxsize=8))
+            _session.mount('http://', HTTPAdapter(pool_maxsize=8))
+    return _session
+
+
+def build_payload(input_text, source_url):
+    return {
+        "script": {
+            "type": "text",
+            "subtitles": "false",
+            "provider": {
+                "type": "microsoft",
+                "voice_id": "en-US-JennyNeural"
+            },
+            "ssml": "false",
+            "input": f"{input_text}"
+        },
+        "config": {
+            "fluent": "false",
+            "pad_audio": "0.0",
+            "driver_expressions": {
+                "expressions": [
+                    {
+                        "start_frame": 0,
+                        "expression": "happy",
+                        "intensity": 0.75
+                    }
+                ]
+            }
+        },
+        "source_url": f"{source_url}"
+    }
+
+
+def submit_talk(username, password, input_text, source_url, base_url=None, session=None):
+    """POST the talk and return its id."""
+    session = session or get_session()
+    headers = {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "authorization": 'Basic ' + username + ':' + password
+    }
+    throttle("did")
+    with span("did.submit"):
+        response = session.post(f"{base_url or DID_API_URL}/talks", json=build_payload(input_text, source_url),
+                                headers=headers, timeout=30)
+        response.raise_for_status()
+        return response.json()['id']
+
+
+def wait_for_talk(username, password, talk_id, base_url=None, session=None,
+                  first_poll=None, max_poll=None, deadline=None):
+    """
+    Poll the talk with exponential backoff until it is done, fails, or the
+    deadline passes. Timings default to the module settings at call time.
+    """
+    session = session or get_session()
+    first_poll = first_poll or FIRST_POLL
+    max_poll = max_poll or MAX_POLL
+    deadline = deadline or DEADLINE
+    headers = {
+        "accept": "application/json",
+        "authorization": 'Basic ' + username + ':' + password
+    }
+    talk_url = f"{base_url or DID_API_URL}/talks/{talk_id}"
+    with span("did.wait", talk=talk_id) as s:
+        give_up = time.monotonic() + deadline
+        delay = first_poll
+        while True:
+            s["polls"] = s.get("polls", 0) + 1
+            throttle("did")
+            response = session.get(talk_url, headers=headers, timeout=30)
+            response.raise_for_status()
+            video_response = response.json()
+            status = video_response.get("status")
+            if status == "done":
+                return video_response["result_url"]
+            if status in ("error", "rejected"):
+                raise VideoError(f"talk {talk_id} {status}: {video_response.get('error')}")
+            if time.monotonic() + delay > give_up:
+                raise VideoError(f"talk {talk_id} not done after {deadline:.0f}s, last status {status}")
+            time.sleep(delay)
+            delay = min(delay * 2, max_poll)
+
+
+def generate_video(username, password, input_text, source_url, base_url=None, session=None):
+    """Blocking render, answered from the cache when the same text and image were rendered before."""
+    key = make_key(input_text, source_url)
+    with span("did.video", chars=len(input_text)) as s:
+        video_url = video_cache.get(key)
+        s["cache"] = "miss" if video_url is None else "hit"
+        if video_url is None:
+            talk_id = submit_talk(username, password, input_text, source_url, base_url, session)
+            video_url = wait_for_talk(username, password, talk_id, base_url, session)
+            video_cache.set(key, video_url, RESULT_TTL)
+    return video_url
+
+
+def submit_video(username, password, input_text, source_url, base_url=None, session=None):
+    """Run generate_video on a background thread and return its Future."""
+    return _jobs.submit(propagate(generate_video), username, password, input_text, source_url, base_url, session)
@@ -0,0 +1,44 @@
+import pandas as pd
+from search import cached_search
+from results import to_frame
+from tracing import span
+
+
+QUOTE_TTL = 60  # seconds, a quote is reused for at most a minute per symbol
+GRAPH_DATE_FORMAT = "%b %d %Y, %I:%M %p UTC%z"  # e.g. "Jun 14 2024, 04:00 PM UTC-04:00"
+
+
+def normalize_symbol(symbol):
+    """' amzn:nasdaq ' -> 'AMZN:NASDAQ' so every spelling shares one cache entry."""
+    return "".join(symbol.split()).upper()
+
+
+def get_quote(symbol, api_key):
+    params = {
+        "engine": "google_finance",
+        "q": normalize_symbol(symbol),
+        "api_key": f'{api_key}'
+    }
+    return cached_search(params, ttl=QUOTE_TTL)
+
+
+def quote_summary(results):
+    summary = results["summary"]
+    movement = summary["price_movement"]
+    return "The last or closing price is {} which is {} by {}.".format(
+        summary["price"], movement["movement"], movement["value"])
+
+
+def price_frame(results):
+    """
+    Intraday prices indexed by exchange local time. The whole date column is
+    parsed in one vectorized call; points with an unexpected date are dropped.
+    """
+    with span("finance.chart") as s:
+        df = to_frame(results, "graph")
+        times = pd.to_datetime(df["date"], format=GRAPH_DATE_FORMAT, errors="coerce")
+        if times.dt.tz is not None:
+            times = times.dt.tz_localize(None)
+        prices = pd.DataFrame({"Time": times, "Price": df["price"].astype("float64")})
+        s["points"] = len(df)
+        return prices.dropna().set_index("Time")
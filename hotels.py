@@ -0,0 +1,65 @@
+import json
+from search import cached_search
+from summarize import count_tokens
+
+
+PAGE_SIZE = 7  # properties added to the comparison per step
+COLUMNS = ["name", "type", "class", "rating", "reviews", "price_per_night", "total_price",
+           "location_rating", "amenities"]
+MAX_AMENITIES = 12
+
+
+def project(prop):
+    """Only the fields the comparison prompt uses, flattened, from one SerpAPI property."""
+    amenities = prop.get("amenities") or []
+    return {
+        "name": prop.get("name"),
+        "type": prop.get("type"),
+        "class": prop.get("hotel_class") or prop.get("extracted_hotel_class"),
+        "rating": prop.get("overall_rating"),
+        "reviews": prop.get("reviews"),
+        "price_per_night": (prop.get("rate_per_night") or {}).get("lowest"),
+        "total_price": (prop.get("total_rate") or {}).get("lowest"),
+        "location_rating": prop.get("location_rating"),
+        "amenities": ", ".join(amenities[:MAX_AMENITIES]),
+    }
+
+
+def compact_table(rows):
+    """Pipe separated table with one header line, far fewer tokens than the same rows as json."""
+    def cell(value):
+        return "" if value is None else str(value).replace("|", "/").replace("\n", " ")
+    lines = [" | ".join(COLUMNS)]
+    lines.extend(" | ".join(cell(row[c]) for c in COLUMNS) for row in rows)
+    return "\n".join(lines)
+
+
+def _property_key(prop):
+    return prop.get("property_token") or prop.get("name")
+
+
+def search_hotels(params, limit=PAGE_SIZE):
+    """
+    Returns (properties, more): the first limit properties, following SerpAPI's
+    next_page_token only while fewer than limit have been collected. Pages
+    already fetched come from the search cache, so asking for more only sends
+    the new page. more tells whether further properties can be loaded.
+    """
+    properties, seen = [], set()
+    page_params = dict(params)
+    while True:
+        results = cached_search(page_params)
+        for prop in results.get("properties", []):
+            key = _property_key(prop)
+            if key not in seen:
+                seen.add(key)
+                properties.append(prop)
+        token = (results.get("serpapi_pagination") or {}).get("next_page_token")
+        if len(properties) >= limit or not token:
+            return properties[:limit], bool(token) or len(properties) > limit
+        page_params = dict(params, next_page_token=token)
+
+
+def payload_tokens(properties, table):
+    """(tokens of the raw json dump, tokens of the compact table) for the same properties."""
+    return count_tokens(json.dumps(properties)), count_tokens(table)
@@ -0,0 +1,88 @@
+import time
+from cache import ResultCache, make_key
+from singleflight import flight
+import tracing
+from ratelimit import throttle
+
+
+COMPLETION_TTL = 7 * 24 * 60 * 60
+
+# temperature 0 completions are deterministic enough to replay, keyed on (model, messages, temperature)
+completion_cache = ResultCache("completions", max_items=128, max_disk_items=2000)
+completion_cache.stats['saved_tokens'] = 0
+
+
+def _cached(model, messages, temperature):
+    if temperature != 0:
+        return None, None
+    key = make_key(model, messages, temperature)
+    hit = completion_cache.get(key)
+    if hit is not None:
+        completion_cache.stats['saved_tokens'] += hit[1]
+    return key, hit
+
+
+def chat_completion(client, model, messages, temperature=0):
+    """
+    Single non streaming chat completion, returns (text, total_tokens).
+    Identical temperature 0 calls already in flight are waited for, not repeated.
+    """
+    with tracing.span("openai.chat", model=model) as s:
+        key, hit = _cached(model, messages, temperature)
+        s["cache"] = "miss" if hit is None else "hit"
+        if hit is not None:
+            text, s["tokens"] = hit
+        elif key is not None:
+            text, s["tokens"] = flight.do(("completion", key), _complete, client, model, messages, temperature, key)
+        else:
+            text, s["tokens"] = _complete(client, model, messages, temperature, key)
+    return text, s["tokens"]
+
+
+def _complete(client, model, messages, temperature, key):
+    throttle("openai")
+    start = time.perf_counter()
+    response = client.chat.completions.create(model=model, messages=messages, temperature=temperature)
+    text, tokens = response.choices[0].message.content, response.usage.total_tokens
+    completion_cache.record(False, time.perf_counter() - start)
+    if key is not None:
+        completion_cache.set(key, [text, tokens], COMPLETION_TTL)
+    return text, tokens
+
+
+def stream_chat_completion(client, model, messages, temperature=0):
+    """
+    Streaming chat completion. Yields (delta, None) for each piece of text as it
+    arrives and finally ("", total_tokens) once the usage chunk is received.
+    A cached answer is yielded as a single delta.
+    """
+    start = time.perf_counter()
+    key, hit = _cached(model, messages, temperature)
+    if hit is not None:
+        tracing.record("openai.chat.stream", start, time.perf_counter() - start, model=model, cache="hit",
+                       tokens=hit[1])
+        yield hit[0], None
+        yield "", hit[1]
+        return
+    throttle("openai")
+    response = client.chat.completions.create(model=model, messages=messages, temperature=temperature,
+                                              stream=True, stream_options={"include_usage": True})
+    tokens = 0
+    first = None
+    pieces = []
+    for chunk in response:
+        if chunk.usage is not None:
+            tokens = chunk.usage.total_tokens
+        if chunk.choices and chunk.choices[0].delta.content:
+            if first is None:
+                first = time.perf_counter() - start
+            pieces.append(chunk.choices[0].delta.content)
+            yield pieces[-1], None
+    seconds = time.perf_counter() - start
+    completion_cache.record(False, seconds)
+    # recorded once the stream is drained, the time includes the reader rendering each piece
+    tracing.record("openai.chat.stream", start, seconds, model=model, cache="miss", tokens=tokens,
+                   first_token_seconds=round(first or seconds, 3))
+    if key is not None:
+        completion_cache.set(key, ["".join(pieces), tokens], COMPLETION_TTL)
+    yield "", tokens
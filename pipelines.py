@@ -0,0 +1,195 @@
+"""
+What each service does, without the widgets: building the SerpAPI searches,
+reading the results, preparing the context and asking the model. The
+Streamlit pages call the steps one at a time as the user fills the form,
+batch.py and the benchmark call them headless. Heavier modules are imported
+inside the function that needs them, as in services/common.py.
+"""
+from search import cached_search
+from results import to_frame
+
+
+SOURCES = 3  # results read by a headless summary when no urls are given
+
+HOTEL_PROMPT = """following is a list of resorts that i am considering, the list has 
+                                 some attributes about them. first, i need you to summarize the list 
+                                 and give me table showing the price ranges, how many stars, and amenities for each of the resort.  
+                                 then, provice a narrative that summarizes the differences based on 
+                                 the different attributes. provide your recommnedation at the end. provide all of this in a markdown format."""
+
+
+def youtube_params(query, api_key):
+    return {
+        "engine": "youtube",
+        "search_query": f'{query}',
+        "api_key": f'{api_key}',
+        "num": "10"
+    }
+
+
+def web_params(query, api_key):
+    return {
+        "q": f'{query}',
+        "hl": "en",
+        "gl": "us",
+        "api_key": f'{api_key}',
+        "num": "5"
+    }
+
+
+def news_params(topic, api_key):
+    return {
+        "q": f"{topic}",
+        "tbm": "nws",
+        "hl": "en",
+        "gl": "us",
+        "num": "7",
+        "api_key": f'{api_key}',
+    }
+
+
+def hotel_params(place, check_in, check_out, adults, api_key):
+    return {
+        "engine": "google_hotels",
+        "q": f"{place}",
+        "check_in_date": f"{check_in}",
+        "check_out_date": f"{check_out}",
+        "adults": f"{adults}",
+        "currency": "USD",
+        "gl": "us",
+        "hl": "en",
+        "num": "7",
+        "api_key": f'{api_key}'
+    }
+
+
+def search_videos(query, api_key):
+    return to_frame(cached_search(youtube_params(query, api_key)), "video_results", index="Title")
+
+
+def search_web(query, api_key):
+    return to_frame(cached_search(web_params(query, api_key)), "organic_results", index="Position")
+
+
+def search_news(topic, api_key):
+    return to_frame(cached_search(news_params(topic, api_key)), "news_results", index="Position")
+
+
+def read_pages(urls, boilerplate=False):
+    """
+    (pages, failures) for urls, fetched concurrently and cleaned. boilerplate
+    also leaves out the nav, footer and aside elements, and drops lines that
+    are only a menu, cookie banner or footer phrase.
+    """
+    from scraper import scrape_pages
+    from textclean import clean_text, clean_page
+    return scrape_pages(urls, clean=clean_page if boilerplate else clean_text)
+
+
+def page_context(client, model, prompt, pages, focused=True):
+    """
+    (context, tokens) for a question about pages: the most relevant passages
+    when focused, otherwise the whole pages condensed to fit. Pages without
+    text are left out, and at least one must have some.
+    """
+    pages = {url: text for url, text in pages.items() if text.strip()}
+    if not pages:
+        raise ValueError("no page has any text")
+    if focused:
+        from retrieval import PageIndex
+        return PageIndex(client, pages).context(prompt), 0
+    from summarize import condense
+    return condense(client, model, prompt, list(pages.values()))
+
+
+def video_context(client, model, prompt, transcripts):
+    from summarize import condense
+    return condense(client, model, prompt, transcripts)
+
+
+def video_messages(prompt, context):
+    return [{"role": "system", "content": f"{prompt}"}, {"role": "user", "content": context}]
+
+
+def page_messages(prompt, context):
+    return [{"role": "user", "content": f"{prompt}"}, {"role": "user", "content": context}]
+
+
+def hotel_shortlist(params, limit):
+    """(shortlist, more, table): the first limit properties and the compact table sent to the model."""
+    from hotels import search_hotels, project, compact_table
+    shortlist, more = search_hotels(params, limit)
+    return shortlist, more, compact_table([project(prop) for prop in shortlist])
+
+
+def hotel_messages(table, prompt=HOTEL_PROMPT):
+    return [{"role": "user", "content": f"{prompt}"}, {"role": "user", "content": table}]
+
+
+def answer(client, model, messages, temperature=0):
+    """(text, tokens) of one non streaming completion."""
+    from llm import chat_completion
+    return chat_completion(client, model, messages, temperature)
+
+
+# The headless pipelines below each run one service end to end and return a
+# dict of plain values, with the tokens spent.
+
+def _top_links(df, urls, top):
+    if urls:
+        from scraper import split_urls
+        return split_urls(urls) if isinstance(urls, str) else list(urls)
+    return [link for link in df["Link"].dropna()[:top]]
+
+
+def summarize_videos(client, model, query, prompt, api_key, urls=None, top=SOURCES):
+    """Search YouTube for query, transcribe urls or the top results, and answer prompt over them."""
+    from transcribe import transcribe_videos
+    from summarize import summarize
+    links = _top_links(search_videos(query, api_key), urls, top)
+    transcripts, failures = transcribe_videos(client, links)
+    if not transcripts:
+        raise ValueError(f"no transcript for {query!r}: {failures}")
+    text, tokens = summarize(client, model, prompt, transcripts)
+    return {"answer": text, "tokens": tokens, "sources": links, "failures": failures}
+
+
+def _summarize_pages(client, model, df, prompt, urls, top, focused, boilerplate):
+    links = _top_links(df, urls, top)
+    pages, failures = read_pages(links, boilerplate)
+    if not pages:
+        raise ValueError(f"no page could be read: {failures}")
+    context, used = page_context(client, model, prompt, pages, focused)
+    text, tokens = answer(client, model, page_messages(prompt, context))
+    return {"answer": text, "tokens": used + tokens, "sources": list(pages), "failures": failures}
+
+
+def summarize_web(client, model, query, prompt, api_key, urls=None, top=SOURCES, focused=False, boilerplate=False):
+    """Google query, read urls or the top results, and answer prompt over them."""
+    return _summarize_pages(client, model, search_web(query, api_key), prompt, urls, top, focused, boilerplate)
+
+
+def summarize_news(client, model, topic, prompt, api_key, urls=None, top=SOURCES, focused=False, boilerplate=False):
+    """Google News for topic, read urls or the top articles, and answer prompt over them."""
+    return _summarize_pages(client, model, search_news(topic, api_key), prompt, urls, top, focused, boilerplate)
+
+
+def compare_hotels(client, model, place, check_in, check_out, adults, api_key, limit=None, prompt=HOTEL_PROMPT):
+    """Search hotels and ask the model to compare the first limit properties."""
+    from hotels import PAGE_SIZE
+    shortlist, _, table = hotel_shortlist(hotel_params(place, check_in, check_out, adults, api_key),
+                                          int(limit or PAGE_SIZE))
+    text, tokens = answer(client, model, hotel_messages(table, prompt))
+    return {"answer": text, "tokens": tokens, "sources": [prop.get("name") for prop in shortlist]}
+
+
+def finance_quote(symbol, api_key):
+    """Latest quote of symbol, its summary sentence and the number of intraday points."""
+    from finance import get_quote, quote_summary, price_frame
+    results = get_quote(symbol, api_key)
+    if "error" in results:
+        raise ValueError(results["error"])
+    prices = price_frame(results)
+    summary = results["summary"]
+    return {"answer": quote_summary(results), "price": summary.get("extracted_price"),
+            "movement": summary["price_movement"].get("movement"), "points": len(prices), "tokens": 0}
@@ -0,0 +1,73 @@
+"""
+Per upstream API rate limits, shared by every thread in the process. The
+call sites name the API they are about to hit:
+
+    throttle("serpapi")
+
+which returns at once unless a limit is set for that name, in which case it
+waits for the next free slot. Limits come from SUPERAPP_RATE_LIMITS, e.g.
+"serpapi=2,openai=8" for calls per second, or from set_limit().
+"""
+import os, time, threading
+import tracing
+
+
+class RateLimiter:
+    """
+    At most per_second calls per second on average, with up to burst calls let
+    through at once after an idle period. Callers are given slots in the order
+    they arrive and sleep outside the lock until theirs comes.
+    """
+
+    def __init__(self, per_second, burst=1):
+        self.interval = 1.0 / per_second
+        self.burst = max(1, int(burst))
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait for a slot, returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._next = max(self._next, now - self.interval * (self.burst - 1))
+            wait = self._next - now
+            self._next += self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+
+# api name -> RateLimiter, names used: serpapi, openai, web, did
+limits = {}
+
+
+def set_limit(name, per_second, burst=1):
+    """Limit calls to name, a per_second of 0 or None removes the limit."""
+    if per_second:
+        limits[name] = RateLimiter(per_second, burst)
+    else:
+        limits.pop(name, None)
+
+
+def parse_limits(spec):
+    """'serpapi=2,openai=8' -> {'serpapi': 2.0, 'openai': 8.0}"""
+    parsed = {}
+    for part in spec.replace(" ", "").split(","):
+        if part:
+            name, _, value = part.partition("=")
+            parsed[name] = float(value)
+    return parsed
+
+
+def throttle(name):
+    limiter = limits.get(name)
+    if limiter is None:
+        return
+    start = time.perf_counter()
+    waited = limiter.acquire()
+    if waited > 0:
+        tracing.record("ratelimit.wait", start, waited, api=name)
+
+
+for _name, _rate in parse_limits(os.environ.get('SUPERAPP_RATE_LIMITS', '')).items():
+    set_limit(_name, _rate)
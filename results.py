@@ -0,0 +1,99 @@
+import os, time, uuid
+import pandas as pd
+from tracing import span
+
+
+# SerpAPI result list -> (field path, column, dtype) for each column we keep
+TABLES = {
+    "video_results": [
+        ("title", "Title", "string"),
+        ("link", "Link", "string"),
+        ("length", "Length", "string"),
+        ("published_date", "Published_date", "string"),
+    ],
+    "organic_results": [
+        ("position", "Position", "Int64"),
+        ("title", "Title", "string"),
+        ("link", "Link", "string"),
+        ("snippet", "Snippet", "string"),
+    ],
+    "news_results": [
+        ("position", "Position", "Int64"),
+        ("title", "Title", "string"),
+        ("link", "Link", "string"),
+        ("snippet", "Snippet", "string"),
+    ],
+    "properties": [
+        ("name", "Name", "string"),
+        ("type", "Type", "string"),
+        ("hotel_class", "Hotel_class", "string"),
+        ("overall_rating", "Overall_rating", "Float64"),
+        ("reviews", "Reviews", "Int64"),
+        ("rate_per_night.extracted_lowest", "Rate_per_night", "Float64"),
+        ("total_rate.extracted_lowest", "Total_rate", "Float64"),
+        ("link", "Link", "string"),
+    ],
+    "graph": [
+        ("date", "date", "string"),
+        ("price", "price", "Float64"),
+    ],
+}
+
+# search history is only written when this is set, one parquet part file per search
+HISTORY_DIR = os.environ.get("SUPERAPP_HISTORY_DIR")
+
+
+def _field(result, path):
+    for part in path.split("."):
+        if not isinstance(result, dict):
+            return None
+        result = result.get(part)
+    return result
+
+
+def to_frame(results, key, index=None):
+    """
+    Build a typed DataFrame straight from a SerpAPI response. Fields missing
+    from a result become nulls instead of raising. index names a column to
+    use as the index, as the old CSV round trip did with index_col=0.
+    """
+    spec = TABLES[key]
+    rows = results.get(key) or []
+    df = pd.DataFrame({column: pd.array([_field(r, path) for r in rows], dtype=dtype)
+                       for path, column, dtype in spec})
+    if index is not None:
+        df = df.set_index(index)
+    return df
+
+
+def append_history(key, df, query, session_id, history_dir=None):
+    """
+    Append a result table to the search history as a new parquet part under
+    <history_dir>/<key>/session=<session_id>/. Nothing is written when no
+    history directory is configured. Returns the path written or None.
+    """
+    history_dir = history_dir or HISTORY_DIR
+    if not history_dir:
+        return None
+    directory = os.path.join(history_dir, key, f"session={session_id}")
+    os.makedirs(directory, exist_ok=True)
+    df = df.reset_index().assign(query=query, fetched_at=pd.Timestamp.now(tz="UTC"))
+    path = os.path.join(directory, f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet")
+    with span("history.write", table=key, rows=len(df)) as s:
+        df.to_parquet(path, index=False)
+        s["bytes"] = os.path.getsize(path)
+    return path
+
+
+def load_history(key, history_dir=None):
+    """
+    Every stored result table for key, across sessions, as one DataFrame.
+    Empty when no history directory is configured or nothing was stored.
+    """
+    history_dir = history_dir or HISTORY_DIR
+    if not history_dir:
+        return pd.DataFrame()
+    directory = os.path.join(history_dir, key)
+    if not os.path.isdir(directory):
+        return pd.DataFrame()
+    return pd.read_parquet(directory)
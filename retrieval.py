@@ -0,0 +1,197 @@
+import os, zipfile, hashlib, tempfile, threading
+import numpy as np
+from collections import OrderedDict
+from cache import CACHE_DIR, PRUNE_EVERY
+from singleflight import flight
+from summarize import iter_chunks, SEPARATOR
+from textclean import iter_blocks
+from tracing import span
+from ratelimit import throttle
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+CHUNK_TOKENS = 400
+BATCH_SIZE = 256  # inputs per embeddings call
+TOP_K = 6
+MAX_PAGES = 64  # pages kept embedded in memory
+MAX_PAGES_BYTES = 64 * 1024 * 1024  # and the most their chunks and vectors may take
+EMBEDDING_DIR = os.path.join(CACHE_DIR, "embeddings")
+MAX_DISK_PAGES = 2000  # embedded pages kept on disk, the least recently used beyond that are deleted
+
+# (url, content hash) -> (chunks, unit length float32 vectors)
+_pages = OrderedDict()
+_pages_bytes = 0
+_pages_lock = threading.Lock()
+_writes = 0
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embed(client, texts):
+    """Embed texts in batches, returns an (n, d) array of unit length float32 vectors."""
+    parts = []
+    with span("openai.embed", inputs=len(texts)):
+        for i in range(0, len(texts), BATCH_SIZE):
+            throttle("openai")
+            response = client.embeddings.create(model=EMBEDDING_MODEL, input=texts[i:i + BATCH_SIZE])
+            # float32 a batch at a time, a list of python floats takes about eight times the room
+            parts.append(np.asarray([item.embedding for item in response.data], dtype=np.float32))
+    matrix = np.vstack(parts) if parts else np.zeros((0, 1), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    return matrix
+
+
+def _load(path):
+    with np.load(path, allow_pickle=False) as data:
+        entry = list(data["chunks"]), data["vectors"]
+    os.utime(path)  # the modification time orders the pages for pruning
+    return entry
+
+
+def _save(path, chunks, vectors):
+    """Write to a temporary file and move it into place, so a reader never sees half a file."""
+    global _writes
+    os.makedirs(EMBEDDING_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=EMBEDDING_DIR, suffix=".tmp", delete=False) as f:
+        try:
+            np.savez(f, chunks=np.array(chunks), vectors=vectors)
+        except BaseException:
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
+    with _pages_lock:
+        _writes += 1
+        prune = _writes % PRUNE_EVERY == 0
+    if prune:
+        _prune()
+
+
+def _prune():
+    """Delete the least recently used pages past MAX_DISK_PAGES."""
+    paths = [entry.path for entry in os.scandir(EMBEDDING_DIR) if entry.name.endswith(".npz")]
+    if len(paths) <= MAX_DISK_PAGES:
+        return
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
+    for path in sorted(paths, key=mtime)[:len(paths) - MAX_DISK_PAGES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # already removed by another process
+
+
+def _embed_page(client, url, text, key):
+    path = os.path.join(EMBEDDING_DIR, f"{content_hash(url + key[1])}.npz")
+    with span("embed.page", url=url) as s:
+        entry = None
+        if os.path.exists(path):
+            try:
+                entry = _load(path)
+                s["cache"] = "disk"
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                pass  # unreadable, embedded again below
+        if entry is None:
+            s["cache"] = "miss"
+            # split a block of the page at a time, the splitter's copies stay block sized
+            chunks = list(iter_chunks(iter_blocks([text]), CHUNK_TOKENS))
+            entry = (chunks, embed(client, chunks))
+            _save(path, chunks, entry[1])
+        s["chunks"] = len(entry[0])
+    return entry
+
+
+def page_vectors(client, url, text):
+    """
+    Chunks and vectors of one page, embedded once per (url, content hash) and
+    kept on disk, up to MAX_DISK_PAGES pages. Concurrent calls for the same
+    page share one embedding. text must not be blank.
+    """
+    key = (url, content_hash(text))
+    with _pages_lock:
+        if key in _pages:
+            _pages.move_to_end(key)
+            return _pages[key]
+    entry = flight.do(("embed",) + key, _embed_page, client, url, text, key)
+    _keep(key, entry)
+    return entry
+
+
+def _size(entry):
+    chunks, vectors = entry
+    return vectors.nbytes + sum(len(chunk) for chunk in chunks)
+
+
+def _keep(key, entry):
+    """Keep entry in the memory LRU, evicting the oldest pages past MAX_PAGES or MAX_PAGES_BYTES."""
+    global _pages_bytes
+    size = _size(entry)
+    with _pages_lock:
+        if key in _pages:
+            _pages_bytes -= _size(_pages.pop(key))
+        if size > MAX_PAGES_BYTES:
+            return  # read back from disk when asked again
+        _pages[key] = entry
+        _pages_bytes += size
+        while len(_pages) > MAX_PAGES or _pages_bytes > MAX_PAGES_BYTES:
+            _pages_bytes -= _size(_pages.popitem(last=False)[1])
+
+
+def clear_memory():
+    """Forget the pages embedded in memory, the disk store is left as it is."""
+    global _pages_bytes
+    with _pages_lock:
+        _pages.clear()
+        _pages_bytes = 0
+
+
+class PageIndex:
+    """Chunks of several pages and their vectors, searchable by cosine similarity."""
+
+    def __init__(self, client, pages):
+        self.client = client
+        self.sources, self.chunks, parts = [], [], []
+        for url, text in pages.items():
+            if not text.strip():
+                continue  # nothing to embed, and the embeddings api rejects empty input
+            chunks, vectors = page_vectors(client, url, text)
+            self.sources.extend([url] * len(chunks))
+            self.chunks.extend(chunks)
+            parts.append(vectors)
+        self.vectors = np.vstack(parts) if parts else np.zeros((0, 1), dtype=np.float32)
+        self._faiss = None
+        if faiss is not None and len(self.chunks):
+            self._faiss = faiss.IndexFlatIP(self.vectors.shape[1])
+            self._faiss.add(self.vectors)
+
+    def _hits(self, question, k):
+        if not self.chunks:
+            return []
+        k = min(k, len(self.chunks))
+        query = embed(self.client, [question])
+        with span("retrieval.search", chunks=len(self.chunks), faiss=self._faiss is not None):
+            if self._faiss is not None:
+                scores, idx = self._faiss.search(query, k)
+                return list(zip(idx[0].tolist(), scores[0].tolist()))
+            scores = self.vectors @ query[0]
+            idx = np.argpartition(-scores, k - 1)[:k]
+            return sorted(zip(idx.tolist(), scores[idx].tolist()), key=lambda hit: -hit[1])
+
+    def search(self, question, k=TOP_K):
+        """Top k (url, chunk, score) for question, best first."""
+        return [(self.sources[i], self.chunks[i], score) for i, score in self._hits(question, k)]
+
+    def context(self, question, k=TOP_K):
+        """The top k chunks formatted as prompt context, in page order."""
+        hits = sorted(i for i, _ in self._hits(question, k))
+        return SEPARATOR.join(f"Source: {self.sources[i]}\n{self.chunks[i]}" for i in hits)
@@ -0,0 +1,230 @@
+import os, re, time, codecs, threading, requests
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from requests.adapters import HTTPAdapter
+from cache import ResultCache, make_key
+from textclean import iter_clean, clean_page
+from singleflight import flight
+from tracing import span, propagate
+from ratelimit import throttle
+
+
+MAX_WORKERS = 6
+TIMEOUT = 20  # seconds per url, for the whole download as well as each connect and read
+
+PAGE_TTL = 30 * 60  # a scraped page is reused for half an hour, so follow-up questions don't refetch it
+MAX_PAGE_BYTES = int(os.environ.get('SUPERAPP_MAX_PAGE_BYTES', 4 * 1024 * 1024))  # html read per url, the rest is dropped
+READ_BYTES = 64 * 1024
+USER_AGENT = os.environ.get('USER_AGENT', 'Mozilla/5.0 (compatible; superapp)')
+
+Scraped = namedtuple("Scraped", ["url", "text", "error", "seconds"])
+
+PAGE_MEMORY_BYTES = 16 * 1024 * 1024  # page text kept in process memory, the rest is read back from disk
+
+# (url, name of the clean function) -> page text
+page_cache = ResultCache("pages", max_items=64, max_memory_bytes=PAGE_MEMORY_BYTES)
+
+MAX_HOSTS = 32  # hosts whose connections are kept open, the least recently used beyond that are closed
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    The pooled requests.Session shared by every scrape. Its adapter keeps a
+    connection pool for the MAX_HOSTS most recently used hosts, so pasting
+    many different sites cannot pile up sockets.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=MAX_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+    return _session
+
+
+def split_urls(raw):
+    """Split the pasted text on whitespace, dropping blanks and duplicates but keeping order."""
+    return list(dict.fromkeys(raw.split()))
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Visible text of an html document fed in pieces, one line per block
+    element. skip names more elements whose whole subtree is left out.
+    """
+
+    SKIP = {"script", "style", "noscript", "template", "svg", "iframe"}
+    CHROME = {"nav", "footer", "aside"}  # site navigation and footers, left out when stripping boilerplate
+    BLOCK = {"p", "div", "br", "li", "tr", "td", "th", "h1", "h2", "h3", "h4", "h5", "h6", "title",
+             "section", "article", "header", "footer", "nav", "aside", "main", "ul", "ol", "table",
+             "blockquote", "pre", "figcaption", "dt", "dd"}
+
+    def __init__(self, skip=()):
+        super().__init__()
+        self.skip = self.SKIP | set(skip)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.skip:
+            self.skipping += 1
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.skip:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+    def take(self):
+        text = "".join(self.parts)
+        self.parts = []
+        return text
+
+
+_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+def _encoding(response, head):
+    """Charset from the content-type header, else from a meta tag near the top, else utf-8."""
+    if "charset" in response.headers.get("content-type", "").lower():
+        return response.encoding
+    match = _CHARSET.search(head)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def _iter_body(response):
+    """
+    The decoded body in pieces of whatever each read of the socket returned,
+    up to READ_BYTES, so a caller can check its deadline between reads.
+    """
+    read1 = getattr(response.raw, "read1", None)
+    if read1 is None:  # urllib3 1.x, each piece waits for READ_BYTES
+        yield from response.iter_content(READ_BYTES)
+        return
+    while True:
+        data = read1(READ_BYTES, decode_content=True)
+        if not data:
+            return
+        yield data
+
+
+def iter_page_text(url, timeout=TIMEOUT, max_bytes=None, stats=None, skip=()):
+    """
+    Yield the text of the page at url piece by piece while it downloads. The
+    html is decoded and parsed incrementally and never held whole, and no
+    more than max_bytes of it are read. A download still running timeout
+    seconds after the request was sent raises requests.Timeout, so a server
+    trickling bytes cannot hold a worker for a read timeout per piece.
+    stats, when given, receives the bytes read and whether the page was cut
+    off. The elements named in skip are left out with everything inside them.
+    """
+    max_bytes = max_bytes or MAX_PAGE_BYTES
+    stats = {} if stats is None else stats
+    stats.update(bytes=0, truncated=False)
+    extractor = _TextExtractor(skip)
+    decoder = None
+    deadline = time.monotonic() + timeout
+    with get_session().get(url, timeout=timeout, stream=True, headers={"User-Agent": USER_AGENT}) as response:
+        response.raise_for_status()
+        for data in _iter_body(response):
+            if time.monotonic() > deadline:
+                raise requests.Timeout(f"{url} still downloading after {timeout}s")
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(_encoding(response, data[:2048]))(errors="replace")
+            if stats["bytes"] + len(data) > max_bytes:
+                data = data[:max_bytes - stats["bytes"]]
+                stats["truncated"] = True
+            stats["bytes"] += len(data)
+            extractor.feed(decoder.decode(data))
+            text = extractor.take()
+            if text:
+                yield text
+            if stats["truncated"]:
+                break
+    if decoder is not None:
+        extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    text = extractor.take()
+    if text:
+        yield text
+
+
+def _fetch_page(url, key, timeout, clean, max_bytes):
+    """
+    Download, extract and clean the page as one stream, so the raw html and
+    the uncleaned text are only ever held a block at a time.
+    """
+    throttle("web")
+    with span("scrape.load") as s:
+        skip = _TextExtractor.CHROME if clean is clean_page else ()
+        pieces = iter_page_text(url, timeout, max_bytes, stats=s, skip=skip)
+        text = "".join(iter_clean(pieces, clean)) if clean else "".join(pieces)
+        s["chars"] = len(text)
+    page_cache.set(key, text, PAGE_TTL)
+    return text
+
+
+def scrape_url(url, clean=None, timeout=TIMEOUT, max_bytes=None):
+    """Text of the page at url, cleaned with clean while it downloads, from the cache when fetched before."""
+    key = make_key(url, getattr(clean, "__name__", None))
+    with span("scrape", url=url) as s:
+        text = page_cache.get(key)
+        s["cache"] = "miss" if text is None else "hit"
+        if text is None:
+            text = flight.do(("scrape", key), _fetch_page, url, key, timeout, clean, max_bytes)
+        s["chars"] = len(text)
+        return text
+
+
+def _timed_scrape(url, clean, timeout, max_bytes):
+    start = time.perf_counter()
+    try:
+        text = scrape_url(url, clean, timeout, max_bytes)
+        if not text.strip():
+            return Scraped(url, "", "no text on the page", time.perf_counter() - start)
+        return Scraped(url, text, None, time.perf_counter() - start)
+    except Exception as e:
+        return Scraped(url, "", f"{type(e).__name__}: {e}", time.perf_counter() - start)
+
+
+def iter_scraped(urls, clean=None, max_workers=MAX_WORKERS, timeout=TIMEOUT, max_bytes=None):
+    """
+    Fetch and clean the urls concurrently, yielding a Scraped per url as
+    soon as it finishes. Failures are reported in Scraped.error, never raised.
+    """
+    if not urls:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        futures = [pool.submit(propagate(_timed_scrape), url, clean, timeout, max_bytes) for url in urls]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def scrape_pages(urls, clean=None, max_workers=MAX_WORKERS, timeout=TIMEOUT, max_bytes=None):
+    """
+    Returns (pages, failures): a dict of url -> text for every page that
+    loaded with some text, in the order the urls were given, and a dict of
+    url -> error message for the rest.
+    """
+    done = {}
+    for page in iter_scraped(urls, clean, max_workers, timeout, max_bytes):
+        done[page.url] = page
+    pages = {u: done[u].text for u in urls if done[u].error is None}
+    failures = {u: done[u].error for u in urls if done[u].error is not None}
+    return pages, failures
@@ -0,0 +1,71 @@
+import re, json, time
+from serpapi import GoogleSearch
+from cache import ResultCache, make_key
+from singleflight import flight
+from tracing import span
+from ratelimit import throttle
+
+
+# seconds a result stays fresh, quotes move every minute while video and hotel listings barely change
+ENGINE_TTL = {
+    "google_finance": 60,
+    "google_news": 15 * 60,
+    "google": 60 * 60,
+    "youtube": 6 * 60 * 60,
+    "google_hotels": 6 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+search_cache = ResultCache("serpapi")
+
+
+def engine_of(params):
+    engine = params.get("engine", "google")
+    if engine == "google" and params.get("tbm") == "nws":
+        return "google_news"
+    return engine
+
+
+def normalize_params(params):
+    """Drop the api key and whitespace noise so equivalent searches share one cache entry."""
+    normalized = {}
+    for k, v in params.items():
+        if k == "api_key":
+            continue
+        normalized[str(k)] = re.sub(r"\s+", " ", str(v)).strip()
+    return normalized
+
+
+def _fetch(params, key, ttl):
+    throttle("serpapi")
+    start = time.perf_counter()
+    with span("serpapi.fetch") as s:
+        results = GoogleSearch(params).get_dict()
+        s["bytes"] = len(json.dumps(results))
+    search_cache.record(False, time.perf_counter() - start)
+    if "error" not in results:
+        if ttl is None:
+            ttl = ENGINE_TTL.get(engine_of(params), DEFAULT_TTL)
+        search_cache.set(key, results, ttl)
+    return results
+
+
+def cached_search(params, ttl=None, refresh=False):
+    """
+    Drop in replacement for GoogleSearch(params).get_dict() that serves repeat
+    searches from the cache. Identical searches already in flight in another
+    session are waited for rather than sent again. refresh skips the cache
+    read, to renew an entry before it expires. Error responses are returned
+    but never cached.
+    """
+    key = make_key(normalize_params(params))
+    with span("serpapi.search", engine=engine_of(params)) as s:
+        if not refresh:
+            start = time.perf_counter()
+            results = search_cache.get(key)
+            if results is not None:
+                search_cache.record(True, time.perf_counter() - start)
+                s["cache"] = "hit"
+                return results
+        s["cache"] = "miss"
+        return flight.do(("search", key), _fetch, params, key, ttl)
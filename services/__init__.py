@@ -0,0 +1,62 @@
+"""
+One module per service in the sidebar. A service module, and with it the
+heavy libraries it needs, is only imported the first time that service is
+selected, so the Home page and cold workers never pay for pandas, langchain,
+pytube or serpapi.
+"""
+import sys, time, logging, importlib
+import tracing
+
+
+log = logging.getLogger("superapp.startup")
+
+
+# sidebar label -> module under services/
+SERVICES = {
+    ":rainbow[Home]": "home",
+    ":blue[YouTube search]": "youtube_search",
+    ":red[Generic search]": "generic_search",
+    ":green[Topic search]": "topic_search",
+    ":gray[Hotel search]": "hotel_search",
+    ":violet[Finance search]": "finance_search",
+}
+
+# seconds spent importing each service the first time, and rendering it the first time
+IMPORT_TIMES = {}
+FIRST_RENDER_TIMES = {}
+
+
+def load_service(chosen):
+    name = SERVICES[chosen]
+    if f"services.{name}" in sys.modules:
+        # import_module waits for an import still running in another thread, e.g. the prewarm
+        return importlib.import_module(f"services.{name}")
+    start = time.perf_counter()
+    with tracing.span("service.import", service=name):
+        module = importlib.import_module(f"services.{name}")
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    log.info("imported services.%s in %.3fs", name, IMPORT_TIMES[name])
+    return module
+
+
+def render_service(chosen, model):
+    """
+    Import and render the chosen service, timing its first render in this
+    process. Every run is traced on its own, returns the trace id.
+    """
+    name = SERVICES[chosen]
+    trace_id = tracing.new_trace_id()
+    with tracing.span(f"render.{name}", trace_id=trace_id, model=model):
+        module = load_service(chosen)
+        start = time.perf_counter()
+        module.render(model)
+    if name not in FIRST_RENDER_TIMES:
+        FIRST_RENDER_TIMES[name] = time.perf_counter() - start
+        log.info("first render of %s took %.3fs", name, FIRST_RENDER_TIMES[name])
+    return trace_id
+
+
+def timing_report():
+    """Rows of (service, import seconds, first render seconds) for the services loaded so far."""
+    return [(name, round(IMPORT_TIMES.get(name, 0.0), 3), round(FIRST_RENDER_TIMES[name], 3))
+            for name in SERVICES.values() if name in FIRST_RENDER_TIMES]
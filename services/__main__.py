@@ -0,0 +1,25 @@
+"""
+Cold import time of every service, each measured in a fresh interpreter so
+one service's imports can't hide another's. Run from the repository root:
+
+    python -m services
+"""
+import sys, subprocess
+from services import SERVICES
+
+
+PROBE = "import time; s = time.perf_counter(); import services.{name}; print(time.perf_counter() - s)"
+
+
+def main():
+    print(f"{'service':<16} {'cold import s':>14}")
+    for name in SERVICES.values():
+        result = subprocess.run([sys.executable, "-c", PROBE.format(name=name)], capture_output=True, text=True)
+        if result.returncode:
+            print(f"{name:<16} {'failed':>14}  {result.stderr.strip().splitlines()[-1]}")
+        else:
+            print(f"{name:<16} {float(result.stdout):>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
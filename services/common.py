@@ -0,0 +1,177 @@
+"""
+Helpers shared by the service pages. Only light modules are imported here,
+anything heavier is imported inside the function that needs it.
+"""
+import streamlit as st, os, sys, uuid, logging
+import tracing
+from concurrent.futures import wait
+from cache import make_key
+from llm import chat_completion, stream_chat_completion
+
+
+log = logging.getLogger("superapp.openai")
+
+@st.cache_resource
+def get_client():
+    """One OpenAI client per process, shared by every session and rerun."""
+    from openai import OpenAI
+    return OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+
+
+def serp_api_key():
+    return os.environ.get('SERPAPI_KEY')
+
+
+def did_api_key():
+    return os.environ.get('DID_API_KEY')
+
+
+def session_id():
+    """Stable id for the browser session, used to keep its search history apart."""
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+
+def record_search(key, df, query):
+    """Append a result table to the search history once per query per session, not on every rerun."""
+    from results import append_history
+    recorded = st.session_state.setdefault("recorded_searches", set())
+    if (key, query) not in recorded:
+        recorded.add((key, query))
+        append_history(key, df, query, session_id())
+
+
+def getgptresponse(client, model, temperature, message, streaming):
+    """
+    Without streaming yields a single (output, tokens). With streaming yields
+    (delta, None) as the text arrives and a final ("", tokens). When the call
+    fails the error is logged and shown, and nothing more is yielded.
+    """
+    try:
+        if streaming:
+            yield from stream_chat_completion(client, model, message, temperature)
+        else:
+            yield chat_completion(client, model, message, temperature)
+
+    except Exception as e:
+        log.exception("completion with %s failed", model)
+        st.error(f"The model could not answer: {type(e).__name__}: {e}")
+
+
+def write_stream(responses):
+    """Render streamed deltas as they arrive, returns (output, tokens)."""
+    usage = {}
+    def deltas():
+        for text, tokens in responses:
+            if tokens is not None:
+                usage["tokens"] = tokens
+            if text:
+                yield text
+    output = st.write_stream(deltas())
+    return output, usage.get("tokens", 0)
+
+
+def page_context(client, model, prompt, pages):
+    """
+    Context for a question about scraped pages. By default only the passages
+    most relevant to the question are sent, from an index that is embedded
+    once per page, so follow-up questions stay small and cheap.
+    """
+    if not any(text.strip() for text in pages.values()):
+        st.warning("None of the pages had any text to answer from.")
+        st.stop()
+    focused = st.toggle("Answer from the most relevant passages only", value=True,
+                        help="Turn off to send the whole pages, e.g. for a summary of everything.")
+    with st.spinner("Reading the content..."):
+        from pipelines import page_context as build_context
+        return build_context(client, model, prompt, pages, focused)[0]
+
+
+def show_output(client, model, message, temperature=0):
+    """Ask how to present the answer, then stream it as text or hand it to the talking head."""
+    choice_output = st.radio(
+        "How do you want to see the output?",
+        ["View the text copy", "Read out by a talking head"],
+        index=None, horizontal=True,
+    )
+    if choice_output == None:
+        pass
+    elif choice_output=="View the text copy":
+        _, tokens = write_stream(getgptresponse(client, model, temperature=temperature, message=message, streaming=True))
+        if tokens:
+            st.caption(f"{tokens:,} tokens")
+    elif choice_output=="Read out by a talking head":
+        output, tokens = next(getgptresponse(client, model, temperature=temperature, message=message, streaming=False),
+                              ("", 0))
+        if not output:
+            return  # a failed call is already shown, and an empty answer is not worth a render
+        st.caption(f"{tokens:,} tokens")
+        img = "" #provide url to your image or upload from your local directory...png preferred
+        show_video(output, img)
+
+
+def show_video(text, img):
+    """
+    Render the talking head in the background, one job per (text, image) per
+    session so reruns pick up the same render instead of starting another.
+    """
+    from did_video import submit_video
+    jobs = st.session_state.setdefault("video_jobs", {})
+    key = make_key(text, img)
+    if key not in jobs:
+        split_key = did_api_key().split(':')
+        username = split_key[0]
+        password = split_key[1]
+        jobs[key] = submit_video(username, password, text, img)
+    with st.spinner("Rendering the talking head..."):
+        wait([jobs[key]], timeout=20)
+    if not jobs[key].done():
+        st.info("Still rendering, check again in a moment.")
+        st.button("Check again")
+        return
+    try:
+        st.video(jobs[key].result())
+    except Exception as e:
+        del jobs[key]
+        st.error(f"Could not render the video: {e}")
+
+
+def show_cache_stats():
+    """Counters of the caches that have been loaded in this process, without importing the others."""
+    with st.sidebar.expander("Cache statistics"):
+        if "search" in sys.modules:
+            st.write("SerpAPI searches")
+            st.json(sys.modules["search"].search_cache.summary())
+        st.write("Chat completions")
+        st.json(sys.modules["llm"].completion_cache.summary())
+        st.write("Requests shared with other sessions")
+        st.json(sys.modules["singleflight"].flight.stats)
+
+
+def show_trace(trace_id):
+    """
+    Optional sidebar panel with every step of the last run: how long it took,
+    the bytes or characters it moved, the tokens it used and whether a cache
+    answered it. Indentation shows which step ran inside which.
+    """
+    if not st.sidebar.toggle("Show performance", help="Time spent in each step of the last run"):
+        return
+    steps = tracing.tree(trace_id)
+    rows = []
+    for depth, s in steps:
+        attrs = s["attrs"]
+        rows.append({
+            "step": "\u2003" * depth + s["name"],
+            "ms": round(s["seconds"] * 1000, 1),
+            "size": attrs.get("bytes", attrs.get("chars")),
+            "tokens": attrs.get("tokens"),
+            "cache": attrs.get("cache"),
+            "error": attrs.get("error"),
+        })
+    billed = sum(s["attrs"].get("tokens") or 0 for _, s in steps
+                 if s["name"].startswith("openai.") and s["attrs"].get("cache") == "miss")
+    with st.sidebar.expander("Performance", expanded=True):
+        if not rows:
+            st.write("Nothing traced yet.")
+            return
+        st.caption(f"{rows[0]['ms']:,.0f} ms in total, {billed:,} tokens billed")
+        st.dataframe(rows, hide_index=True, width="stretch")
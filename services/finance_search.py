@@ -0,0 +1,19 @@
+import streamlit as st
+from results import to_frame
+from finance import get_quote, quote_summary, price_frame, normalize_symbol
+from services.common import serp_api_key, record_search
+
+
+def render(model):
+    st.subheader("Get most current quote and a graph.", divider='violet')
+    st.text("Provide a stock symbol with the exchange; e.g., AMZN:NASDAQ.")
+    quote = st.text_input("Your input remember to provide both the symbol and the exchange!")
+    if quote:
+        resultsz = get_quote(quote, serp_api_key())
+        if "error" in resultsz:
+            st.error(resultsz["error"])
+            return
+        st.write(quote_summary(resultsz))
+        st.write("Following is the daily chart:")
+        st.line_chart(price_frame(resultsz))
+        record_search("graph", to_frame(resultsz, "graph"), normalize_symbol(quote))
@@ -0,0 +1,31 @@
+import streamlit as st
+from scraper import split_urls
+from pipelines import search_web, read_pages, page_messages
+from services.common import get_client, serp_api_key, record_search, show_output, page_context
+
+
+def render(model):
+    client = get_client()
+    st.subheader("Google Search & Summarize.", divider='red')
+    search_query = st.text_input("Please enter your Google search (e.g. what is hedge fund?) and hit enter.")
+    if search_query:
+        df_srch = search_web(search_query, serp_api_key())
+        record_search("organic_results", df_srch, search_query)
+        st.write("Top 5 results from the search, copy the url of the video of interest:")
+        st.dataframe(df_srch.head(5))
+        st.divider()
+        
+        st.write("We will need the url from above list that you want a LLM to summarize the content of that website.")
+        search_url=st.text_input("Paste the URL or URLS separated by a space that you want to scrape content from. And hit enter.")
+        if search_url:
+            urls = split_urls(search_url)
+            boilerplate = st.checkbox("Drop menu, cookie banner and footer lines")
+            pages, failures = read_pages(urls, boilerplate)
+            for failed_url, error in failures.items():
+                st.warning(f"Could not scrape {failed_url}: {error}")
+            
+            temperature=0
+            prompt1 = st.text_input("Enter your prompt or quesiton related to the website content for LLM to answer.")
+            if prompt1:
+                context = page_context(client, model, prompt1, pages)
+                show_output(client, model, page_messages(prompt1, context), temperature=temperature)
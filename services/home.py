@@ -0,0 +1,20 @@
+import streamlit as st
+
+
+def render(model):
+    info='''
+    This app uses SERP API to scrape results of a google search and youtube search.  
+    We take the URL or video you select from the search and scrape that site/video.  
+    We will then take the scraped content and ask a LLM to summarize it for you.
+    On the left sidebar, there are several choices for search. Select the one that interests you.  
+      
+    
+    __Choices:__  
+    1.) Home - Default, it will show you what you are currently seeing.  
+    2.) YouTube search - Based on your search input, app will give you choices to select from.  
+    3.) Generic search - Type in a generic search as you would intend to on google.com  
+    4.) Topic search - Unlike in #3, here you will select from a list of topics.  
+    5.) Hotel search - Here, you will enter something like "bali resorts".  
+    6.) Finance search - Enter a stock symbol to retrieve quote and news.
+    '''
+    st.markdown(info)
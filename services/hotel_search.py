@@ -0,0 +1,39 @@
+import streamlit as st
+from cache import make_key
+from search import normalize_params
+from hotels import PAGE_SIZE, payload_tokens
+from results import to_frame
+from pipelines import hotel_params, hotel_shortlist, hotel_messages
+from services.common import get_client, serp_api_key, record_search, getgptresponse, write_stream
+
+
+def render(model):
+    client = get_client()
+    st.subheader("Search for Hotels/Resorts and summarize.", divider='gray')
+    search_query2 = st.text_input("Please enter name of island/place (e.g. Bali Resorts) to search for hotels/resorts.")
+    if search_query2:
+        checkin = st.text_input("Please enter the check in date (e.g. 2024-06-25) and hit enter.")
+        if checkin:
+            checkout = st.text_input("Please enter the check out date (e.g. 2024-07-06) andh it enter.")
+            if checkout:
+                guests = st.text_input("Please enter number of guests (e.g. 2) and hit enter")
+                if guests:
+                    params2 = hotel_params(search_query2, checkin, checkout, guests, serp_api_key())
+                    limits = st.session_state.setdefault("hotel_limits", {})
+                    search_key = make_key(normalize_params(params2))
+                    limit = limits.get(search_key, PAGE_SIZE)
+                    shortlist, more, table = hotel_shortlist(params2, limit)
+                    record_search("properties", to_frame({"properties": shortlist}, "properties"), search_query2)
+                    raw_tokens, table_tokens = payload_tokens(shortlist, table)
+                    st.caption(f"Comparing {len(shortlist)} properties. The prompt carries them in {table_tokens:,} tokens "
+                               f"instead of {raw_tokens:,} as raw json ({1 - table_tokens / max(raw_tokens, 1):.0%} fewer).")
+                    if more and st.button(f"Compare {PAGE_SIZE} more properties"):
+                        limits[search_key] = limit + PAGE_SIZE
+                        st.rerun()
+                    temperature=0
+                    #Feel free to change pipelines.HOTEL_PROMPT to your liking, or insert an input variable to capture user specific prompt
+                    getsummary = st.button("Get Results")
+                    if getsummary:
+                        _, tokens = write_stream(getgptresponse(client, model, temperature=temperature,
+                                                                message=hotel_messages(table), streaming=True))
+                        st.caption(f"{tokens:,} tokens")
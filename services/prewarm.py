@@ -0,0 +1,25 @@
+"""
+Background refresh of the Topic search news results. This module is light
+on purpose: the app imports it at startup, and the topic service with its
+pandas and scraping imports is only loaded inside the prewarm thread.
+"""
+import streamlit as st, os, time, threading
+
+
+PREWARM_MINUTES = float(os.environ.get('SUPERAPP_PREWARM_MINUTES', 0))  # 0 turns pre-warming off
+
+
+@st.cache_resource
+def start_prewarm(minutes=PREWARM_MINUTES):
+    """Start one background thread per process that re-runs prewarm_topics every few minutes."""
+    if minutes <= 0:
+        return None
+    def loop():
+        from services import load_service
+        topic_search = load_service(":green[Topic search]")
+        while True:
+            topic_search.prewarm_topics()
+            time.sleep(minutes * 60)
+    thread = threading.Thread(target=loop, name="topic-prewarm", daemon=True)
+    thread.start()
+    return thread
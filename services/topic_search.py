@@ -0,0 +1,53 @@
+import streamlit as st, logging
+from search import cached_search
+from scraper import split_urls
+from pipelines import news_params, search_news, read_pages, page_messages
+from services.common import get_client, serp_api_key, record_search, show_output, page_context
+
+
+log = logging.getLogger("superapp.prewarm")
+
+TOPICS = ('Business', 'Technology', 'Sports')
+
+
+def topic_params(topic):
+    return news_params(topic, serp_api_key())
+
+
+def prewarm_topics():
+    """Refresh the news search of every topic so sessions find them in the cache."""
+    for topic in TOPICS:
+        try:
+            cached_search(topic_params(topic), refresh=True)
+        except Exception as e:
+            log.warning("%s: %s", topic, e)
+
+
+def render(model):
+    client = get_client()
+    st.subheader("Google News Topics & Summarize.", divider='green')
+    topic_select = st.selectbox('Which of the following topics you want to retrieve news headlines for?',
+                          ('',) + TOPICS)
+    if topic_select != '':
+        df_srch = search_news(topic_select, serp_api_key())
+        record_search("news_results", df_srch, topic_select)
+        st.write("Top 7 results from the search based on your topic, copy the url of the video of interest:")
+        st.dataframe(df_srch.head(7))
+        st.divider()
+        
+        st.write("We will need the url from above list that you want a LLM to summarize the content of that website.")
+        search_url=st.text_input("Paste the URL or URLS separated by a space that you want to scrape content from. And hit enter.")
+        if search_url:
+            urls = split_urls(search_url)
+            boilerplate = st.checkbox("Drop menu, cookie banner and footer lines")
+            pages, failures = read_pages(urls, boilerplate)
+            for failed_url, error in failures.items():
+                st.warning(f"Could not scrape {failed_url}: {error}")
+            
+            temperature=0
+            prompt2 = st.text_input("Enter your prompt or quesiton related to the website content for LLM to answer.")
+            if prompt2:
+                context = page_context(client, model, prompt2, pages)
+                show_output(client, model, page_messages(prompt2, context), temperature=temperature)
+    else:
+        pass
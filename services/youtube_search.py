@@ -0,0 +1,34 @@
+import streamlit as st
+from scraper import split_urls
+from transcribe import transcribe_videos
+from pipelines import search_videos, video_context, video_messages
+from services.common import get_client, serp_api_key, record_search, show_output
+
+
+def render(model):
+    client = get_client()
+    st.subheader("YouTube Search & Summarize.", divider='blue')
+    yt_url = st.text_input("Enter search term for YouTube search and hit enter.")
+    if yt_url:
+        df_yt = search_videos(yt_url, serp_api_key())
+        record_search("video_results", df_yt, yt_url)
+        st.write("Top 10 results from the search, copy the url of the video of interest:")
+        st.dataframe(df_yt.head(10))
+        st.divider()
+        st.write("We will need the url from above list for the video you want a LLM to summarize the content of the video")
+        yt_url=st.text_input("Paste the YouTube URL or URLs you want to download audio for, separate URL with a space. And hit enter.")
+        if yt_url:
+            urls = split_urls(yt_url)
+            with st.spinner("Downloading and transcribing..."):
+                transcripts, failures = transcribe_videos(client, urls)
+            for failed_url, error in failures.items():
+                st.warning(f"Could not transcribe {failed_url}: {error}")
+            if not transcripts:
+                st.warning("None of the videos could be transcribed.")
+                st.stop()
+            
+            prompt = st.text_input("Enter prompt for LLM, e.g. Summarize the following youtube transcripts.")
+            if prompt:
+                with st.spinner("Reading the content..."):
+                    context, _ = video_context(client, model, prompt, transcripts)
+                show_output(client, model, video_messages(prompt, context), temperature=0)
@@ -0,0 +1,42 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls that share a key into one. The first caller runs
+    the function, callers arriving while it is still running wait for and
+    share its result or exception. Nothing is kept once the call finishes,
+    storing results is left to the caches in front of each service.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {'calls': 0, 'shared': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.stats['calls'] += 1
+            else:
+                self.stats['shared'] += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+# one per process, shared by every session, keys are tuples starting with the service name
+flight = SingleFlight()
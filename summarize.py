@@ -0,0 +1,155 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from llm import chat_completion
+from tracing import span, propagate
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# total context window per model, in tokens
+MODEL_CONTEXT = {
+    "gpt-3.5-turbo-0125": 16385,
+    "gpt-4o-2024-05-13": 128000,
+}
+DEFAULT_CONTEXT = 16385
+RESPONSE_TOKENS = 1500  # kept free for the answer
+CHUNK_TOKENS = 4000  # size of each piece sent to the map step
+MAX_WORKERS = 4
+MAX_ROUNDS = 4
+
+MAP_PROMPT = """You are condensing part of a longer document so that another step can answer this request: "{prompt}".
+Keep every fact, number, name and quote that could matter for the request. Leave out everything else."""
+
+SEPARATOR = "\n\n---\n\n"
+
+_encoding = None  # False once loading the tiktoken encoding has failed
+
+
+def count_tokens(text):
+    """Exact count with tiktoken when it is installed, otherwise a 4 characters per token estimate."""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # the encoding is downloaded on first use, offline we fall back to the estimate
+            _encoding = False
+    if not _encoding:
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def context_budget(model, prompt=""):
+    """Tokens available for document content once the prompt and the answer are accounted for."""
+    window = MODEL_CONTEXT.get(model, DEFAULT_CONTEXT)
+    return window - RESPONSE_TOKENS - count_tokens(prompt) - 100
+
+
+def chunk_text(text, chunk_tokens):
+    with span("split", chars=len(text)) as s:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_tokens, chunk_overlap=0,
+                                                  length_function=count_tokens)
+        chunks = splitter.split_text(text)
+        s["chunks"] = len(chunks)
+    return chunks
+
+
+def _pack(pieces, budget):
+    """Greedily group consecutive pieces so each group fits in budget tokens."""
+    groups, current, size = [], [], 0
+    for piece in pieces:
+        n = count_tokens(piece)
+        if current and size + n > budget:
+            groups.append(current)
+            current, size = [], 0
+        current.append(piece)
+        size += n
+    if current:
+        groups.append(current)
+    return [SEPARATOR.join(group) for group in groups]
+
+
+def _fits(documents, budget):
+    """Whether the documents joined fit in budget tokens, stopping at the first one that overflows."""
+    total = count_tokens(SEPARATOR) * max(len(documents) - 1, 0)
+    for doc in documents:
+        total += count_tokens(doc)
+        if total > budget:
+            return False
+    return True
+
+
+def iter_chunks(documents, chunk_tokens):
+    """Chunks of every document in order, each document is only split when its chunks are needed."""
+    for doc in documents:
+        yield from chunk_text(doc, chunk_tokens)
+
+
+def _map(client, model, prompt, pieces):
+    """
+    Condense every piece concurrently, keeping their order. pieces can be a
+    generator, no more than twice MAX_WORKERS are taken ahead of the answers.
+    """
+    system = {"role": "system", "content": MAP_PROMPT.format(prompt=prompt)}
+    ask = propagate(lambda piece: chat_completion(client, model, [system, {"role": "user", "content": piece}]))
+    texts, used = [], 0
+    def collect(job):
+        nonlocal used
+        text, tokens = job.result()
+        texts.append(text)
+        used += tokens
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        running = deque()
+        for piece in pieces:
+            if len(running) >= 2 * MAX_WORKERS:
+                collect(running.popleft())
+            running.append(pool.submit(ask, piece))
+        while running:
+            collect(running.popleft())
+    return texts, used
+
+
+def condense(client, model, prompt, documents, budget=None):
+    """
+    Reduce documents to a single string that fits the model's context next to prompt.
+
+    Returns (context, tokens_used). When everything already fits, the documents
+    are joined as is and no tokens are spent. Otherwise they are cut into
+    token sized chunks, each chunk is condensed concurrently, and the partial
+    results are grouped and condensed again until they fit.
+    """
+    with span("condense", documents=len(documents)) as s:
+        if budget is None:
+            budget = context_budget(model, prompt)
+        if _fits(documents, budget):
+            s["rounds"] = 0
+            return SEPARATOR.join(documents), 0
+
+        chunk_tokens = min(CHUNK_TOKENS, budget)
+        pieces = iter_chunks(documents, chunk_tokens)
+        s["tokens"] = 0
+        for rounds in range(1, MAX_ROUNDS + 1):
+            s["rounds"] = rounds
+            pieces, tokens = _map(client, model, prompt, pieces)
+            if rounds == 1:
+                s["chunks"] = len(pieces)
+            s["tokens"] += tokens
+            context = SEPARATOR.join(pieces)
+            if count_tokens(context) <= budget:
+                return context, s["tokens"]
+            pieces = _pack(pieces, chunk_tokens)
+
+        # the model kept answering at length, keep what fits rather than overflow
+        return chunk_text(context, budget)[0], s["tokens"]
+
+
+def summarize(client, model, prompt, documents, temperature=0, budget=None):
+    """Answer prompt over documents of any length, returns (text, total_tokens)."""
+    context, used = condense(client, model, prompt, documents, budget)
+    messages = [{"role": "system", "content": prompt}, {"role": "user", "content": context}]
+    text, tokens = chat_completion(client, model, messages, temperature)
+    return text, used + tokens
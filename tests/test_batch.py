@@ -0,0 +1,62 @@
+import os, sys, json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batch import read_rows, run_batch, ParquetWriter
+
+ROWS = [{"job": "web", "query": "solar panels", "urls": ""}, {"job": "finance", "query": "AAPL"}]
+EXPECTED = [{"job": "web", "query": "solar panels"}, {"job": "finance", "query": "AAPL"}]
+
+
+def test_reads_a_json_array(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(ROWS, indent=2))
+    assert list(read_rows(str(path))) == EXPECTED
+
+
+def test_reads_json_lines(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in ROWS) + "\n\n")
+    assert list(read_rows(str(path))) == EXPECTED
+
+
+def test_reads_csv(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text("job,query,urls\nweb,solar panels,\nfinance,AAPL,\n")
+    assert list(read_rows(str(path))) == EXPECTED
+
+
+def test_parquet_records_are_on_disk_once_written(tmp_path):
+    path = str(tmp_path / "out.parquet")
+    writer = ParquetWriter(path)
+    writer.write({"id": "a", "job": "web", "status": "ok", "sources": ["https://a.test"], "seconds": 0.1})
+    writer.write({"id": "b", "job": "web", "status": "error", "error": "ValueError: x", "seconds": 0.1})
+    assert ParquetWriter(path).done() == {"a"}
+
+
+def test_csv_line_with_a_trailing_comma(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text("job,query\nfinance,AAPL,\n")
+    assert list(read_rows(str(path))) == [{"job": "finance", "query": "AAPL"}]
+
+
+class ListWriter:
+    def __init__(self):
+        self.records = []
+
+    def done(self):
+        return set()
+
+    def write(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+
+def test_a_row_that_is_not_an_object_is_reported(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text('["finance", "AAPL"]\n{"job": "nope", "query": "x"}\n')
+    writer = ListWriter()
+    ok, failed, skipped = run_batch(read_rows(str(path)), writer, None, None, log=open(os.devnull, "w"))
+    assert (ok, failed, skipped) == (0, 2, 0)
+    assert writer.records[0]["error"].startswith("row is not an object")
@@ -0,0 +1,52 @@
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cache as cache_module
+from cache import ResultCache
+
+
+def test_memory_tier_is_bounded_by_bytes(tmp_path):
+    cache = ResultCache("t", path=str(tmp_path / "t.sqlite3"), max_memory_bytes=100)
+    cache.set("a", "x" * 40, 60)
+    cache.set("b", "y" * 40, 60)
+    cache.set("c", "z" * 40, 60)
+    assert list(cache._memory) == ["b", "c"] and cache._memory_bytes <= 100
+    cache.set("big", "w" * 500, 60)
+    assert "big" not in cache._memory
+    assert cache.get("big") == "w" * 500 and cache.stats["disk_hits"] == 1
+    assert cache.get("a") == "x" * 40
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_entries_expire_in_both_tiers(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    path = str(tmp_path / "t.sqlite3")
+    cache = ResultCache("t", path=path)
+    cache.set("a", {"v": 1}, 60)
+    clock.now += 30
+    assert cache.get("a") == {"v": 1}
+    assert ResultCache("t", path=path).get("a") == {"v": 1}
+    clock.now += 31
+    assert cache.get("a") is None
+    assert ResultCache("t", path=path).get("a") is None
+
+
+def test_prune_drops_expired_then_the_soonest_to_expire(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    monkeypatch.setattr(cache_module, "PRUNE_EVERY", 6)
+    cache = ResultCache("t", path=str(tmp_path / "t.sqlite3"), max_disk_items=3)
+    cache.set("expired", 0, 1)
+    clock.now += 10
+    for i, ttl in enumerate([50, 10, 40, 20, 30]):
+        cache.set(f"k{i}", i, ttl)
+    keys = {row[0] for row in cache._connect().execute("SELECT key FROM entries")}
+    assert keys == {"k0", "k2", "k4"}
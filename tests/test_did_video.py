@@ -0,0 +1,67 @@
+import os, sys, threading
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+import did_video
+from cache import ResultCache
+from stubs import StubServer
+
+RESULT = "https://d-id.test/talk.mp4"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock for did_video, sleep advances it and records the delay."""
+    state = SimpleNamespace(now=0.0, sleeps=[])
+    def sleep(seconds):
+        state.sleeps.append(seconds)
+        state.now += seconds
+    monkeypatch.setattr(did_video, "time", SimpleNamespace(monotonic=lambda: state.now, sleep=sleep))
+    return state
+
+
+@pytest.fixture
+def server():
+    with StubServer(latency=0) as server:
+        yield server
+
+
+def polls(server, *statuses):
+    server.httpd.did = {"create": {"id": "tlk"},
+                        "polls": [dict(status=status, result_url=RESULT, error="bad image") for status in statuses]}
+
+
+def test_polls_back_off_up_to_max_poll(server, clock):
+    polls(server, "created", "started", "started", "started", "done")
+    url = did_video.wait_for_talk("u", "p", "tlk_1", server.url, first_poll=1, max_poll=3, deadline=60)
+    assert url == RESULT
+    assert clock.sleeps == [1, 2, 3, 3]
+
+
+def test_gives_up_at_the_deadline(server, clock):
+    polls(server, "started")
+    with pytest.raises(did_video.VideoError, match="not done after 10s, last status started"):
+        did_video.wait_for_talk("u", "p", "tlk_1", server.url, first_poll=1, max_poll=8, deadline=10)
+    assert clock.sleeps == [1, 2, 4]
+
+
+@pytest.mark.parametrize("status", ["error", "rejected"])
+def test_failed_talk_raises(server, clock, status):
+    polls(server, "started", status)
+    with pytest.raises(did_video.VideoError, match=f"tlk_1 {status}: bad image"):
+        did_video.wait_for_talk("u", "p", "tlk_1", server.url, first_poll=1)
+    assert clock.sleeps == [1]
+
+
+def test_same_text_and_image_render_once(server, clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(did_video, "video_cache", ResultCache("did_videos", path=str(tmp_path / "did.sqlite3")))
+    polls(server, "started", "done")
+    first = did_video.generate_video("u", "p", "Hello there.", "https://img.test/face.png", server.url)
+    again = did_video.generate_video("u", "p", "Hello there.", "https://img.test/face.png", server.url)
+    other = did_video.submit_video("u", "p", "Something else.", "https://img.test/face.png", server.url).result()
+    assert first == again == other == RESULT
+    assert server.httpd.talks == 2
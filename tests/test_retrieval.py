@@ -0,0 +1,56 @@
+import os, sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import retrieval
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.inputs = []
+
+    def create(self, model, input):
+        assert all(text.strip() for text in input), "empty input sent to the embeddings api"
+        self.inputs.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[len(text), 1.0]) for text in input])
+
+
+def test_index_skips_pages_without_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval, "EMBEDDING_DIR", str(tmp_path))
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    index = retrieval.PageIndex(client, {"https://a.test": "Some words on the page.", "https://b.test": " \n"})
+    assert set(index.sources) == {"https://a.test"}
+    assert index.search("words")[0][0] == "https://a.test"
+
+
+def test_pages_are_embedded_once_and_read_back_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval, "EMBEDDING_DIR", str(tmp_path))
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    chunks, vectors = retrieval.page_vectors(client, "https://a.test", "Some words on the page.")
+    retrieval.clear_memory()
+    again, again_vectors = retrieval.page_vectors(client, "https://a.test", "Some words on the page.")
+    assert client.embeddings.inputs == chunks and again == chunks
+    assert (again_vectors == vectors).all()
+    assert [name for name in os.listdir(tmp_path) if not name.endswith(".npz")] == []
+
+
+def test_a_damaged_file_is_embedded_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval, "EMBEDDING_DIR", str(tmp_path))
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    retrieval.page_vectors(client, "https://a.test", "Other words.")
+    retrieval.clear_memory()
+    for name in os.listdir(tmp_path):
+        (tmp_path / name).write_bytes(b"PK\x03\x04 cut short")
+    chunks, _ = retrieval.page_vectors(client, "https://a.test", "Other words.")
+    assert client.embeddings.inputs == chunks + chunks
+
+
+def test_disk_store_keeps_the_most_recently_used_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval, "EMBEDDING_DIR", str(tmp_path))
+    monkeypatch.setattr(retrieval, "MAX_DISK_PAGES", 3)
+    for i in range(5):
+        path = tmp_path / f"{i}.npz"
+        path.write_bytes(b"")
+        os.utime(path, (i, i))
+    retrieval._prune()
+    assert sorted(os.listdir(tmp_path)) == ["2.npz", "3.npz", "4.npz"]
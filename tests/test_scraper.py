@@ -0,0 +1,62 @@
+import os, sys, time, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest, requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper import _TextExtractor, iter_page_text
+
+HTML = ("<html><head><title>Title</title><script>var x = 1;</script></head><body>"
+        "<nav><ul><li>Home</li><li>World</li></ul></nav><article><p>The story.</p>"
+        "<aside>Related: other things</aside><p>More of it.</p></article><footer>Example Inc.</footer></body></html>")
+
+
+def text_of(html, skip=()):
+    extractor = _TextExtractor(skip)
+    for i in range(0, len(html), 13):
+        extractor.feed(html[i:i + 13])
+    extractor.close()
+    return " ".join(extractor.take().split())
+
+
+def test_extractor_keeps_visible_text():
+    assert text_of(HTML) == "Title Home World The story. Related: other things More of it. Example Inc."
+
+
+def test_extractor_skips_navigation_and_footers_when_asked():
+    assert text_of(HTML, _TextExtractor.CHROME) == "Title The story. More of it."
+
+
+class _Trickle(BaseHTTPRequestHandler):
+    """Sends a large page a few bytes at a time, each read well within the socket timeout."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("content-type", "text/html; charset=utf-8")
+        self.send_header("content-length", str(1000 * 20))
+        self.end_headers()
+        try:
+            for _ in range(1000):
+                self.wfile.write(b"<p>word</p>words ")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def test_a_trickling_page_stops_at_the_deadline():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Trickle)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        start = time.monotonic()
+        with pytest.raises(requests.Timeout, match="still downloading after 0.5s"):
+            for _ in iter_page_text(f"http://127.0.0.1:{httpd.server_port}/slow", timeout=0.5):
+                pass
+        assert time.monotonic() - start < 2
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
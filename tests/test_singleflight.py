@@ -0,0 +1,60 @@
+import os, sys, time, threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from singleflight import SingleFlight
+
+
+def run_together(flight, fn, callers=5):
+    """Start callers threads on the same key, release fn once they all wait on it, returns their outcomes."""
+    release = threading.Event()
+    outcomes = [None] * callers
+    def call(i):
+        try:
+            outcomes[i] = ("ok", flight.do("key", fn, release))
+        except Exception as e:
+            outcomes[i] = ("error", e)
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats["calls"] + flight.stats["shared"] < callers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_callers_share_one_call():
+    flight, runs = SingleFlight(), []
+    def fn(release):
+        runs.append(1)
+        release.wait(5)
+        return object()
+    outcomes = run_together(flight, fn)
+    assert len(runs) == 1 and flight.stats == {"calls": 1, "shared": 4}
+    assert len({id(value) for _, value in outcomes}) == 1
+
+
+def test_concurrent_callers_share_one_exception():
+    flight = SingleFlight()
+    def fn(release):
+        release.wait(5)
+        raise ValueError("upstream down")
+    outcomes = run_together(flight, fn)
+    assert {kind for kind, _ in outcomes} == {"error"}
+    assert len({id(e) for _, e in outcomes}) == 1
+
+
+def test_nothing_is_kept_after_the_call():
+    flight, runs = SingleFlight(), []
+    def fn():
+        runs.append(1)
+        return len(runs)
+    assert flight.do("key", fn) == 1
+    assert flight.do("key", fn) == 2
+    with pytest.raises(ZeroDivisionError):
+        flight.do("key", lambda: 1 / 0)
+    assert flight.do("key", fn) == 3
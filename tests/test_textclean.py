@@ -0,0 +1,69 @@
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from textclean import clean_text, clean_page, strip_boilerplate, iter_blocks, iter_clean
+
+
+def test_keeps_sentence_and_clause_punctuation():
+    assert clean_text("Is it? Yes! First: this; then that, done.") == "Is it? Yes! First: this; then that, done."
+
+
+def test_drops_symbols_and_collapses_spaces():
+    assert clean_text("Revenue (adjusted) rose  to $120m #growth") == "Revenue adjusted rose to 120m growth"
+
+
+def test_keeps_letters_of_any_script():
+    assert clean_text("café “naïve” 東京 — it’s") == "café naïve 東京 its"
+
+
+def test_keeps_paragraphs_with_one_blank_line():
+    assert clean_text("one\t two \n\n\n\n three \r\nfour") == "one two\n\nthree\nfour"
+
+
+def test_strip_boilerplate_drops_whole_line_phrases():
+    text = "Menu\nAccept all cookies\nSubscribe to our newsletter\nThe story.\n© 2024 Example News. All rights reserved."
+    assert strip_boilerplate(text) == "The story."
+
+
+def test_strip_boilerplate_keeps_sentences_that_mention_the_phrases():
+    text = "Cookie prices rose 5% this year.\nApple lets users log in with passkeys.\nSubscribe now"
+    assert strip_boilerplate(text) == "Cookie prices rose 5% this year.\nApple lets users log in with passkeys."
+
+
+def test_boilerplate_is_optional():
+    text = "Sign in\nThe story."
+    assert clean_text(text) == "Sign in\nThe story."
+    assert clean_page(text) == "The story."
+
+
+def test_blocks_join_back_into_the_text():
+    text = "first paragraph\n\nsecond line\nthird words here and a longwordwithoutspaces"
+    for size in (5, 12, 20, 64):
+        assert "".join(iter_blocks([text[i:i + 7] for i in range(0, len(text), 7)], size)) == text
+
+
+def test_iter_clean_adds_no_breaks_at_the_cuts():
+    text = "one line\nanother line that goes on and on\n\nnew paragraph, same sentence words"
+    for size in (6, 10, 17, 30, 1000):
+        assert "".join(iter_clean([text], size=size)) == clean_text(text)
+
+
+def test_iter_clean_does_not_split_words():
+    text = "alpha beta gamma delta epsilon"
+    assert "".join(iter_clean([text], size=8)) == text
+
+
+def test_iter_clean_with_boilerplate():
+    text = "Menu\nThe story goes on.\nAccept all cookies\nThe end."
+    for size in (20, 25, 1000):
+        assert "".join(iter_clean([text], clean_page, size=size)) == clean_page(text)
+
+
+def test_strip_boilerplate_keeps_content_that_starts_like_a_copyright_line():
+    text = "Copyright infringement lawsuits rose sharply last year.\n(c) the third condition applies."
+    assert strip_boilerplate(text) == text
+
+
+def test_strip_boilerplate_drops_copyright_footers():
+    text = "The story.\nCopyright © 2010-2024 Example Inc.\n© Example News\nExample Media. All rights reserved."
+    assert strip_boilerplate(text) == "The story."
@@ -0,0 +1,129 @@
+import re
+
+
+KEEP = ",.?!;:"  # punctuation that marks sentence and clause boundaries
+
+
+class _UnicodeTable(dict):
+    """
+    str.translate table filled in lazily, one decision per code point: letters
+    and digits of any script, the punctuation in KEEP, space and newline are
+    kept, other whitespace becomes a space and everything else is dropped.
+    """
+
+    def __missing__(self, code):
+        ch = chr(code)
+        if ch.isalnum() or ch in KEEP or ch in " \n":
+            value = code
+        elif ch.isspace():
+            value = " "
+        else:
+            value = None
+        self[code] = value
+        return value
+
+
+_UNICODE = _UnicodeTable()
+_NON_ASCII = re.compile(r"[^\x00-\x7f]+")
+
+# ascii is handled on the utf-8 bytes in one C level pass, bytes >= 0x80 belong
+# to multi byte characters that were already cleaned and are left alone
+_ASCII_WHITESPACE = bytes.maketrans(b"\t\r\x0b\x0c", b"    ")
+_ASCII_DROP = bytes(c for c in range(128)
+                    if not (chr(c).isalnum() or chr(c) in KEEP or chr(c) in " \n\t\r\x0b\x0c"))
+
+_SPACES = re.compile(rb"  +")
+_BLANK_LINES = re.compile(rb"\n\n\n+")
+
+# whole lines that are navigation, consent banners or footers rather than content,
+# a sentence that merely mentions cookies or logging in never matches
+_BOILERPLATE = re.compile(
+    r"(accept( all)?( cookies)?|reject( all)?( cookies)?|cookie (settings|preferences|policy)|"
+    r"we use cookies|manage (cookies|preferences)|privacy( policy)?|terms( of (use|service))?|"
+    r"skip to( main)? content|sign in|sign up|log ?in|log ?out|register|"
+    r"subscribe( (now|to our newsletter))?|newsletter|share( this( article)?)?|follow us|"
+    r"advertisement|menu|home|search|close|back to top|"
+    r"©[^\n]{0,80}|(\(c\)|copyright)( ?©)? ?\d{4}([-–]\d{4})?[^\n]{0,60}|[^\n]{0,60}all rights reserved)[.!]?",
+    re.IGNORECASE)
+
+
+def strip_boilerplate(text):
+    """Drop lines that consist only of a navigation, cookie banner or footer phrase."""
+    return "\n".join(line for line in text.split("\n") if not _BOILERPLATE.fullmatch(line.strip()))
+
+
+def clean_text(text, boilerplate=False):
+    """
+    Keep letters and digits of any script, sentence and clause punctuation
+    (KEEP) and whitespace. Runs of spaces collapse to one, and newlines are kept with at most one
+    blank line between paragraphs so the splitter still sees the structure.
+    """
+    if boilerplate:
+        text = strip_boilerplate(text)
+    text = _NON_ASCII.sub(lambda m: m.group().translate(_UNICODE), text)
+    data = text.encode("utf-8").translate(_ASCII_WHITESPACE, _ASCII_DROP)
+    data = _SPACES.sub(b" ", data)
+    data = data.replace(b" \n", b"\n").replace(b"\n ", b"\n")
+    data = _BLANK_LINES.sub(b"\n\n", data)
+    return data.decode("utf-8").strip()
+
+
+def clean_page(text):
+    """clean_text with boilerplate stripping, for pages where nav bars and banners are noise."""
+    return clean_text(text, boilerplate=True)
+
+
+CLEAN_BLOCK_CHARS = 64 * 1024
+
+
+def iter_blocks(pieces, size=CLEAN_BLOCK_CHARS):
+    """
+    Regroup a stream of text pieces into blocks of about size characters,
+    cut after a paragraph break where there is one, otherwise after a line
+    break or a space, so the blocks join back into the text unchanged and
+    line based cleaning gives the same result block by block. Only a run of
+    size characters without any whitespace is cut in the middle.
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= size:
+            cut = buffer.rfind("\n\n", 0, size) + 2
+            if cut <= 1:
+                cut = buffer.rfind("\n", 0, size) + 1
+            if cut <= 0:
+                cut = buffer.rfind(" ", 0, size) + 1
+            if cut <= 0:
+                cut = size
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+    if buffer:
+        yield buffer
+
+
+def _separator(space):
+    # the cleaned form of the whitespace between two blocks
+    breaks = space.count("\n")
+    return "\n\n" if breaks > 1 else "\n" if breaks else " " if space else ""
+
+
+def iter_clean(pieces, clean=clean_text, size=CLEAN_BLOCK_CHARS):
+    """
+    Clean a stream of text block by block. Each block is cleaned on its own
+    and yielded with the separator the cut actually went through in front,
+    so "".join(iter_clean(pieces)) gives the text with no paragraph breaks
+    or spaces added at the cuts.
+    """
+    space, started = "", False
+    for block in iter_blocks(pieces, size):
+        body = block.strip()
+        if not body:
+            space += block
+            continue
+        space += block[:block.index(body[0])]
+        cleaned = clean(block)
+        if cleaned:
+            yield (_separator(space) if started else "") + cleaned
+            started, space = True, ""
+        # a block cleaned away entirely leaves one gap, not the sum of both sides
+        space = max(space, block[len(block.rstrip()):], key=lambda gap: (gap.count("\n"), gap != ""))
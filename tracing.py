@@ -0,0 +1,173 @@
+"""
+Lightweight spans around external calls and CPU heavy steps.
+
+    with span("serpapi.search", engine="youtube") as s:
+        results = ...
+        s["bytes"] = len(body)
+
+A span records its name, start, duration, thread and whatever attributes are
+set on it (bytes, tokens, cache, error). Spans opened inside another span are
+its children, also on the worker pools when the job is wrapped in
+propagate(). Finished spans are kept per trace for the sidebar panel and
+passed to every exporter: a JSON lines log when SUPERAPP_TRACE_LOG is set
+(a path, or - for stderr) and OpenTelemetry when SUPERAPP_OTEL is set and
+the opentelemetry api is installed.
+"""
+import os, sys, json, time, uuid, logging, itertools, threading, contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+
+MAX_TRACES = 64  # most recent traces kept in memory for the panel
+MAX_SPANS = 2000  # per trace, so a long loop cannot grow one without bound
+
+TRACE_LOG = os.environ.get('SUPERAPP_TRACE_LOG')
+OTEL = os.environ.get('SUPERAPP_OTEL')
+
+# (trace id, span id) of the span the current code runs in
+_current = contextvars.ContextVar("superapp_span", default=None)
+_ids = itertools.count(1)
+_traces = OrderedDict()  # trace id -> [finished spans]
+_lock = threading.Lock()
+
+# callables taking each finished span as a dict
+exporters = []
+
+
+def new_trace_id():
+    return uuid.uuid4().hex
+
+
+def _finish(record):
+    with _lock:
+        spans = _traces.get(record["trace_id"])
+        if spans is None:
+            spans = _traces[record["trace_id"]] = []
+            while len(_traces) > MAX_TRACES:
+                _traces.popitem(last=False)
+        if len(spans) < MAX_SPANS:
+            spans.append(record)
+    for export in exporters:
+        try:
+            export(record)
+        except Exception as e:
+            print(f"[tracing] {type(e).__name__}: {e}", file=sys.stderr)
+
+
+@contextmanager
+def span(name, trace_id=None, **attrs):
+    """
+    Time the block as a span called name. Yields the attribute dict, so the
+    block can add what it only learns while running. An exception is recorded
+    in the error attribute and raised again.
+    """
+    parent = _current.get()
+    if trace_id is None:
+        trace_id = parent[0] if parent else new_trace_id()
+    span_id = next(_ids)
+    token = _current.set((trace_id, span_id))
+    start, wall = time.perf_counter(), time.time()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        _finish({"name": name, "trace_id": trace_id, "span_id": span_id,
+                 "parent_id": parent[1] if parent and parent[0] == trace_id else None,
+                 "start": wall, "seconds": time.perf_counter() - start,
+                 "thread": threading.current_thread().name, "attrs": attrs})
+
+
+def record(name, start, seconds, **attrs):
+    """
+    Add a span that was timed by the caller, for work that cannot sit inside
+    a with block such as a generator consumed by someone else. start is a
+    time.perf_counter() value.
+    """
+    parent = _current.get()
+    _finish({"name": name, "trace_id": parent[0] if parent else new_trace_id(), "span_id": next(_ids),
+             "parent_id": parent[1] if parent else None,
+             "start": time.time() - (time.perf_counter() - start), "seconds": seconds,
+             "thread": threading.current_thread().name, "attrs": attrs})
+
+
+def propagate(fn):
+    """Wrap fn so spans it opens on a worker thread belong to the span that submitted it."""
+    parent = _current.get()
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def spans(trace_id):
+    """Finished spans of a trace in the order they started."""
+    with _lock:
+        found = list(_traces.get(trace_id, ()))
+    return sorted(found, key=lambda s: s["start"])
+
+
+def tree(trace_id):
+    """(depth, span) pairs of a trace, each span followed by its children."""
+    found = spans(trace_id)
+    ids = {s["span_id"] for s in found}
+    children = {}
+    for s in found:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+    rows = []
+    def walk(parent, depth):
+        for s in children.get(parent, []):
+            rows.append((depth, s))
+            walk(s["span_id"], depth + 1)
+    walk(None, 0)
+    return rows
+
+
+def log_exporter(stream_or_path):
+    """Exporter writing one JSON object per span through the superapp.trace logger."""
+    logger = logging.getLogger("superapp.trace")
+    if stream_or_path == "-":
+        handler = logging.StreamHandler(sys.stderr)
+    else:
+        handler = logging.FileHandler(stream_or_path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    def export(record):
+        logger.info(json.dumps(record, default=str))
+    return export
+
+
+def otel_exporter():
+    """
+    Exporter replaying each finished span on the global OpenTelemetry tracer
+    with its original start and end time. Where the spans go is configured
+    the usual OpenTelemetry way, e.g. by opentelemetry-instrument.
+    """
+    tracer = otel_trace.get_tracer("superapp")
+    def export(record):
+        attributes = {f"superapp.{k}": v for k, v in record.items() if k in ("trace_id", "span_id", "parent_id")
+                      and v is not None}
+        attributes.update({k: v for k, v in record["attrs"].items() if isinstance(v, (str, bool, int, float))})
+        start = int(record["start"] * 1e9)
+        otel_span = tracer.start_span(record["name"], start_time=start, attributes=attributes)
+        otel_span.end(end_time=start + int(record["seconds"] * 1e9))
+    return export
+
+
+if TRACE_LOG:
+    exporters.append(log_exporter(TRACE_LOG))
+if OTEL and otel_trace is not None:
+    exporters.append(otel_exporter())
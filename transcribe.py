@@ -0,0 +1,95 @@
+import os, tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pytube import YouTube, extract
+from cache import ResultCache
+from singleflight import flight
+from tracing import span, propagate
+from ratelimit import throttle
+
+
+MAX_WORKERS = 4
+TRANSCRIPT_TTL = 365 * 24 * 60 * 60  # a video's audio does not change, keep transcripts for a year
+
+# video id -> whisper transcript, a video is only ever sent to whisper once
+transcript_store = ResultCache("transcripts", max_items=64)
+
+
+def video_id(url):
+    return extract.video_id(url)
+
+
+def download_audio(url, directory):
+    """Download the audio track into its own file under directory and return the path."""
+    with span("youtube.download", url=url) as s:
+        stream = YouTube(url).streams.filter(only_audio=True).first()
+        path = stream.download(output_path=directory, filename=f"{video_id(url)}.mp4")
+        s["bytes"] = os.path.getsize(path)
+    return path
+
+
+def transcribe_file(client, path):
+    throttle("openai")
+    with span("openai.transcribe", bytes=os.path.getsize(path)) as s, open(path, "rb") as audio_file:
+        transcript = client.audio.transcriptions.create(
+            model="whisper-1",
+            response_format="text",
+            file=audio_file
+        )
+        s["chars"] = len(transcript)
+    os.remove(path)
+    return transcript
+
+
+def transcribe_video(client, url, vid, directory):
+    """Download and transcribe one video, storing the transcript under its id."""
+    with span("transcribe", video=vid) as s:
+        transcript = transcript_store.get(vid)
+        s["cache"] = "miss" if transcript is None else "hit"
+        if transcript is None:
+            transcript = transcribe_file(client, download_audio(url, directory))
+            transcript_store.set(vid, transcript, TRANSCRIPT_TTL)
+    return transcript
+
+
+def transcribe_videos(client, urls, max_workers=MAX_WORKERS):
+    """
+    Returns (transcripts, failures): one transcript per url in the given order,
+    and a dict of url -> error message for the urls that could not be done.
+
+    Stored transcripts are returned straight away. The rest are downloaded and
+    transcribed on a pool, so whisper works on one video while the next one
+    downloads. A video another session is already transcribing is waited for
+    instead of being done twice.
+    """
+    failures = {}
+    ids = {}
+    for url in urls:
+        try:
+            ids[url] = video_id(url)
+        except Exception as e:
+            failures[url] = f"{type(e).__name__}: {e}"
+
+    found = {}
+    pending = {}
+    for url, vid in ids.items():
+        if vid in found or vid in pending.values():
+            continue
+        transcript = transcript_store.get(vid)
+        if transcript is not None:
+            found[vid] = transcript
+        else:
+            pending[url] = vid
+
+    if pending:
+        with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=max_workers) as pool:
+            jobs = {pool.submit(propagate(flight.do), ("transcribe", vid), transcribe_video, client, url, vid, tmp): url
+                    for url, vid in pending.items()}
+            for job in as_completed(jobs):
+                url = jobs[job]
+                try:
+                    found[pending[url]] = job.result()
+                except Exception as e:
+                    failures[url] = f"{type(e).__name__}: {e}"
+
+    transcripts = [found[ids[url]] for url in urls if url in ids and ids[url] in found]
+    return transcripts, failures